@@ -0,0 +1,81 @@
+"""
+benchmarks/bench_distinct.py
+Accuracy, memory and time of the HyperLogLog sketches in src/sketches.py against exact nunique.
+
+Sketch memory is reported next to the in-memory size of the frame the sketches summarize.
+Run: python benchmarks/bench_distinct.py --rows 1000000 10000000 100000000
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from sketches import SketchTable  # noqa: E402
+
+
+def synthetic(rows: int, products: int = 10, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    # several lines per order and a customer base of ~rows/20, like the real export
+    return pd.DataFrame({
+        "OrderID": rng.integers(0, max(rows // 3, 1), rows),
+        "CustomerID": rng.integers(0, max(rows // 20, 1), rows),
+        "Month": (np.datetime64("2023-01") + rng.integers(0, 24, rows)).astype("datetime64[ns]"),
+        "Region": pd.Categorical.from_codes(rng.integers(0, 5, rows), ["North", "South", "East", "West", "Central"]),
+        "Product": pd.Categorical.from_codes(rng.integers(0, products, rows), [f"P{i}" for i in range(products)]),
+    })
+
+
+def traced(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000, 100_000_000])
+    parser.add_argument("--precision", type=int, nargs="+", default=[10, 12, 14])
+    parser.add_argument("--products", type=int, default=10)
+    parser.add_argument("--json", type=Path, help="optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        df = synthetic(rows, args.products)
+        frame_bytes = int(df.memory_usage(deep=True).sum())
+        print(f"{rows:>12,} rows  frame {frame_bytes/2**20:8.1f} MiB")
+        for column in ("OrderID", "CustomerID"):
+            exact, exact_s, exact_peak = traced(lambda: df[column].nunique())
+            print(f"{rows:>12,} rows  {column:<10} exact {exact:>11,}  {exact_s:7.2f}s  peak {exact_peak/2**20:8.1f} MiB")
+            for p in args.precision:
+                table, build_s, build_peak = traced(lambda: SketchTable.build(df, column, precision=p))
+                t0 = time.perf_counter()
+                est = table.count()
+                query_s = time.perf_counter() - t0
+                error = (est - exact) / exact * 100
+                results.append({"rows": rows, "column": column, "precision": p, "exact": int(exact),
+                                "exact_seconds": exact_s, "exact_peak_bytes": exact_peak, "estimate": est,
+                                "error_pct": error, "build_seconds": build_s, "build_peak_bytes": build_peak,
+                                "query_seconds": query_s, "sketch_bytes": table.nbytes, "frame_bytes": frame_bytes,
+                                "cells": len(table.keys)})
+                print(f"{'':>12}       {'':<10} p={p:<2} {est:>11,} ({error:+6.2f}%)  build {build_s:6.2f}s  "
+                      f"query {query_s*1000:7.1f} ms  sketches {table.nbytes/2**20:7.2f} MiB "
+                      f"({table.nbytes / frame_bytes:6.1%} of frame, {len(table.keys):,} cells)")
+        del df
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+benchmarks/bench_ingest.py
+Compares the default loader with the chunked, typed loader in src/analytics.py.
+
+Each measurement runs in a fresh interpreter so peak RSS belongs to that loader alone.
+Run: python benchmarks/bench_ingest.py --rows 1000000 10000000 50000000
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+WORK_DIR = ROOT / "benchmarks" / "data"
+
+sys.path.insert(0, str(ROOT))
+from generate_sample_data import write_dataset  # noqa: E402
+
+# the loader is timed inside the child. ru_maxrss survives fork+exec from this (large) parent,
+# so prefer the per-process high-water mark from /proc where it exists
+CHILD = """
+import resource, sys, time
+sys.path.insert(0, {src!r})
+from analytics import load_and_prepare
+t0 = time.perf_counter()
+df = load_and_prepare({path!r}, chunksize={chunksize!r})
+elapsed = time.perf_counter() - t0
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+try:
+    with open('/proc/self/status') as f:
+        peak = next(int(l.split()[1]) * 1024 for l in f if l.startswith('VmHWM'))
+except OSError:
+    pass
+print(len(df), elapsed, peak, df.memory_usage(deep=True).sum())
+"""
+
+
+def measure(path: Path, chunksize):
+    out = subprocess.run([sys.executable, "-c", CHILD.format(src=str(SRC), path=str(path), chunksize=chunksize)],
+                         check=True, capture_output=True, text=True).stdout.split()
+    rows, seconds, peak, frame = int(out[0]), float(out[1]), int(out[2]), int(out[3])
+    return {"rows": rows, "seconds": seconds, "peak_rss": peak, "frame_bytes": frame}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000, 50_000_000])
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    parser.add_argument("--json", type=Path, help="optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    WORK_DIR.mkdir(parents=True, exist_ok=True)
+    results = []
+    for rows in args.rows:
+        path = WORK_DIR / f"ingest_{rows}.csv"
+        if not path.exists():
+            print(f"Writing {rows:,} synthetic rows to {path} ...")
+            write_dataset(path, rows, days=730, products=200, customers=100_000, zipf=1.1, seasonality=0.3)
+        size = path.stat().st_size
+        for mode, chunksize in (("default", None), ("chunked", args.chunksize)):
+            r = measure(path, chunksize)
+            r.update(mode=mode, file_bytes=size)
+            results.append(r)
+            print(f"{rows:>12,} rows  {mode:<8} {r['seconds']:8.2f}s  peak RSS {r['peak_rss']/2**20:9.1f} MiB  "
+                  f"frame {r['frame_bytes']/2**20:9.1f} MiB  (file {size/2**20:,.1f} MiB)")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
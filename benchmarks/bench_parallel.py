@@ -0,0 +1,97 @@
+"""
+benchmarks/bench_parallel.py
+Scaling of the parallel partition aggregation (workers=N) against its own single-process path.
+
+The speedup column divides the workers=1 time (the same code-and-bincount aggregation, run in the
+calling process) by the workers=N time, so it measures what the worker processes add; the pandas
+group-by time is printed alongside for reference. Inputs below parallel.PARALLEL_MIN_ROWS always take
+the single-process path, so --rows should stay above it (or lower it with --min-rows).
+
+Run: python benchmarks/bench_parallel.py --rows 10000000 --workers 2 4 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "src")]
+import analytics  # noqa: E402
+import parallel  # noqa: E402
+from generate_sample_data import generate_frame, make_dimensions  # noqa: E402
+
+FUNCTIONS = {
+    "kpis": analytics.kpis,
+    "monthly_revenue": analytics.monthly_revenue,
+    "top_products": analytics.top_products,
+    "revenue_by_region": analytics.revenue_by_region,
+    "monthly_pivot": analytics.monthly_pivot,
+}
+
+def synthetic(rows: int, products: int) -> pd.DataFrame:
+    """Prepared frame straight from the generator, typed like the chunked loader's output."""
+    df = generate_frame(rows, np.random.default_rng(0), make_dimensions(products=products), days=730, zipf=1.1)
+    df = analytics.prepare_frame(df)
+    for col in analytics.CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df
+
+def timed(fn, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def same(a, b) -> bool:
+    if isinstance(a, dict):
+        return all(same(a[k], b[k]) for k in a)
+    if isinstance(a, (pd.Series, pd.DataFrame)):
+        return a.shape == b.shape and np.allclose(np.asarray(a, dtype=float), np.asarray(b, dtype=float), rtol=1e-6)
+    if isinstance(a, float):
+        return np.isclose(a, b, rtol=1e-6)
+    return a == b
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({2, 4, os.cpu_count() or 1} - {1}))
+    parser.add_argument("--min-rows", type=int, default=parallel.PARALLEL_MIN_ROWS,
+                        help="row count below which the aggregation stays in one process")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", type=Path, help="optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    parallel.PARALLEL_MIN_ROWS = args.min_rows
+    df = synthetic(args.rows, args.products)
+    print(f"{len(df):,} rows, {args.products:,} products, {os.cpu_count()} CPUs")
+    if len(df) < args.min_rows:
+        print(f"note: below the {args.min_rows:,}-row threshold every worker count runs in one process")
+    results = []
+    for name, fn in FUNCTIONS.items():
+        pandas_s, expected = timed(lambda: fn(df), args.repeat)
+        serial_s, got = timed(lambda: fn(df, workers=1), args.repeat)
+        print(f"{name:<18} pandas      {pandas_s:8.3f}s")
+        print(f"{'':<18} workers=1   {serial_s:8.3f}s  {'ok' if same(expected, got) else 'MISMATCH'}")
+        for w in args.workers:
+            fn(df, workers=w)  # warm the pool so process start-up isn't timed
+            par_s, got = timed(lambda: fn(df, workers=w), args.repeat)
+            ok = same(expected, got)
+            results.append({"function": name, "rows": len(df), "workers": w, "pandas_seconds": pandas_s,
+                            "serial_seconds": serial_s, "parallel_seconds": par_s, "speedup": serial_s / par_s,
+                            "matches_serial": bool(ok)})
+            print(f"{'':<18} workers={w:<3} {par_s:8.3f}s  x{serial_s / par_s:5.2f}  {'ok' if ok else 'MISMATCH'}")
+    parallel.shutdown()
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
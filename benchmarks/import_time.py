@@ -0,0 +1,70 @@
+"""
+benchmarks/import_time.py
+Import-time breakdown of the entry-point modules (python -X importtime).
+
+Each module is imported in a fresh interpreter, --repeat times (the fastest run is kept, so .pyc
+compilation and a cold page cache don't count). The report gives the wall time of the whole start-up,
+the module's cumulative import time, and the largest contributors grouped by top-level package
+(self time, so nested imports are not counted twice).
+Run: python benchmarks/import_time.py
+     python benchmarks/import_time.py --modules dashboard_static batch_export --top 8 --json import_time.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+
+# dashboard_streamlit is left out: importing it runs the app
+MODULES = ["analytics", "engine", "dashboard_static", "batch_export", "api", "live_tail", "render_server"]
+
+def parse_importtime(stderr: str) -> list:
+    """(self_us, cumulative_us, depth, module) per line of -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cum_us), depth, name.strip()))
+    return rows
+
+def measure(module: str) -> dict:
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=SRC,
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    if proc.returncode:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    rows = parse_importtime(proc.stderr)
+    packages = defaultdict(int)
+    for self_us, _, _, name in rows:
+        packages[name.split(".")[0]] += self_us
+    cumulative = next((cum for _, cum, _, name in rows if name == module), 0)
+    return {"module": module, "wall_ms": wall * 1000, "import_ms": cumulative / 1000,
+            "packages_ms": {k: v / 1000 for k, v in sorted(packages.items(), key=lambda kv: -kv[1])}}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--modules", nargs="+", default=MODULES, help="modules under src/ to import")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5, help="packages to list per module")
+    parser.add_argument("--json", type=Path, help="optional path to write the results as JSON")
+    args = parser.parse_args()
+    results = []
+    for module in args.modules:
+        r = min((measure(module) for _ in range(args.repeat)), key=lambda r: r["wall_ms"])
+        results.append(r)
+        top = ", ".join(f"{k} {v:.0f}" for k, v in list(r["packages_ms"].items())[:args.top])
+        print(f"{module:<18} start-up {r['wall_ms']:7.0f} ms  import {r['import_ms']:7.0f} ms  | {top}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+benchmarks/load_test.py
+Load test for the dashboard-data HTTP API (src/api.py).
+
+Closed-loop clients (one request in flight each) hit a mix of endpoints and filter combinations for a
+fixed duration per concurrency level; latency percentiles and throughput are reported per level.
+--revalidate sends If-None-Match with the last ETag seen for a URL, measuring the 304 path.
+
+Run:
+    python src/api.py data/sample_sales_data.csv --port 8080 &
+    python benchmarks/load_test.py --url http://127.0.0.1:8080 --concurrency 1 8 32 128 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+
+import aiohttp
+import numpy as np
+
+ENDPOINTS = ["kpis", "monthly_revenue", "top_products", "revenue_by_region", "category_share", "monthly_pivot",
+             "auto_insights"]
+
+async def query_mix(session, base: str, seed: int = 0) -> list:
+    """Endpoint x filter URLs built from the years and regions the server actually has."""
+    async with session.get(f"{base}/revenue_by_region") as r:
+        regions = [row["label"] for row in (await r.json())["data"]]
+    async with session.get(f"{base}/monthly_revenue") as r:
+        years = sorted({int(row["label"][:4]) for row in (await r.json())["data"]})
+    rng = random.Random(seed)
+    filters = [""] + [f"year={y}" for y in years] + [f"region={g}" for g in regions]
+    filters += [f"year={rng.choice(years)}&region={','.join(rng.sample(regions, min(2, len(regions))))}"
+                for _ in range(10)]
+    return [f"{base}/{e}?{f}" for e in ENDPOINTS for f in filters]
+
+async def client(session, urls, deadline, latencies, statuses, etags, revalidate, rng):
+    while time.perf_counter() < deadline:
+        url = rng.choice(urls)
+        headers = {"If-None-Match": etags[url]} if revalidate and url in etags else {}
+        t0 = time.perf_counter()
+        async with session.get(url, headers=headers) as r:
+            await r.read()
+            etags[url] = r.headers.get("ETag", "")
+            statuses[r.status] = statuses.get(r.status, 0) + 1
+        latencies.append(time.perf_counter() - t0)
+
+async def run_level(base: str, urls: list, concurrency: int, duration: float, revalidate: bool) -> dict:
+    latencies, statuses, etags = [], {}, {}
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        t0 = time.perf_counter()
+        deadline = t0 + duration
+        await asyncio.gather(*(client(session, urls, deadline, latencies, statuses, etags, revalidate, random.Random(i))
+                               for i in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+    ms = np.array(latencies) * 1000
+    return {"concurrency": concurrency, "requests": len(ms), "requests_per_sec": len(ms) / elapsed,
+            "p50_ms": float(np.percentile(ms, 50)), "p99_ms": float(np.percentile(ms, 99)),
+            "max_ms": float(ms.max()), "statuses": {str(k): v for k, v in sorted(statuses.items())}}
+
+async def main_async(args):
+    base = args.url.rstrip("/")
+    async with aiohttp.ClientSession() as session:
+        urls = await query_mix(session, base)
+    print(f"{len(urls)} distinct URLs, {args.duration:.0f}s per level{' (revalidating)' if args.revalidate else ''}")
+    results = []
+    for c in args.concurrency:
+        r = await run_level(base, urls, c, args.duration, args.revalidate)
+        results.append(r)
+        print(f"concurrency {c:>4}: {r['requests_per_sec']:>9,.0f} req/s  p50 {r['p50_ms']:7.2f} ms  "
+              f"p99 {r['p99_ms']:7.2f} ms  statuses {r['statuses']}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    parser.add_argument("--revalidate", action="store_true", help="send If-None-Match with previously seen ETags")
+    parser.add_argument("--json", type=Path, help="optional path to write the results as JSON")
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+benchmarks/run_benchmarks.py
+Benchmark harness for the loading, analytics and rendering hot paths.
+
+Every stage runs against generated datasets of increasing size and records wall time (best of
+--repeat), peak traced memory and throughput; results are saved as JSON so runs can be compared.
+
+Run:
+    python benchmarks/run_benchmarks.py --rows 100000 1000000 10000000
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<baseline>.json --threshold 0.15
+    python benchmarks/run_benchmarks.py --profile auto_insights --rows 1000000
+"""
+
+import os
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import argparse
+import cProfile
+import gc
+import json
+import platform
+import pstats
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT / "benchmarks" / "data"
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+sys.path[:0] = [str(ROOT), str(ROOT / "src")]
+
+import analytics  # noqa: E402
+import dashboard  # noqa: E402
+from dashboard_static import create_static_dashboard  # noqa: E402
+from generate_sample_data import write_dataset  # noqa: E402
+
+def _plot_dashboard(df):
+    with tempfile.TemporaryDirectory() as tmp:
+        dashboard.plot_dashboard(dashboard.time_series_summary(df), dashboard.top_products(df, n=10),
+                                 dashboard.region_summary(df), dashboard.category_distribution(df),
+                                 Path(tmp) / "d.png", Path(tmp) / "d.pdf")
+
+# name -> (input, fn): "path" stages get the CSV path, "frame" stages the prepared DataFrame
+STAGES = {
+    "load_and_prepare": ("path", analytics.load_and_prepare),
+    "load_and_prepare_chunked": ("path", lambda p: analytics.load_and_prepare(p, chunksize=analytics.DEFAULT_CHUNKSIZE)),
+    "load_and_prepare_compact": ("path", lambda p: analytics.load_and_prepare(p, compact=True)),
+    "load_and_clean": ("path", dashboard.load_and_clean),
+    "kpis": ("frame", analytics.kpis),
+    "monthly_revenue": ("frame", analytics.monthly_revenue),
+    "top_products": ("frame", analytics.top_products),
+    "revenue_by_region": ("frame", analytics.revenue_by_region),
+    "category_share": ("frame", analytics.category_share),
+    "monthly_pivot": ("frame", analytics.monthly_pivot),
+    "top_products_by_region": ("frame", lambda df: analytics.top_products_by_region(df, "North")),
+    "auto_insights": ("frame", analytics.auto_insights),
+    "create_static_dashboard": ("frame", lambda df: create_static_dashboard(df, out_path=None)),
+    "plot_dashboard": ("frame", _plot_dashboard),
+}
+
+def dataset(rows: int) -> Path:
+    path = DATA_DIR / f"bench_{rows}.csv"
+    if not path.exists():
+        print(f"Generating {rows:,} rows -> {path}")
+        write_dataset(path, rows, days=730, products=200, customers=100_000, zipf=1.1, seasonality=0.3,
+                      late_rate=0.01, dirty_rate=0.0005)
+    return path
+
+def run_stage(fn, arg, repeat: int):
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - t0)
+    # separate traced run: tracemalloc slows execution, so it doesn't count towards the timing
+    gc.collect()
+    tracemalloc.start()
+    fn(arg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), peak
+
+def profile_stage(name: str, rows: int, top: int = 30) -> Path:
+    kind, fn = STAGES[name]
+    path = dataset(rows)
+    arg = path if kind == "path" else analytics.load_and_prepare(path)
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    out = RESULTS_DIR / f"{name}-{rows}.prof"
+    prof = cProfile.Profile()
+    prof.runcall(fn, arg)
+    prof.dump_stats(out)
+    pstats.Stats(prof).sort_stats("cumulative").print_stats(top)
+    print(f"Profile written to {out} (view with snakeviz, or render a flame graph with flameprof)")
+    return out
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"timestamp": datetime.now().isoformat(timespec="seconds"), "commit": commit, "python": platform.python_version(),
+            "pandas": pd.__version__, "numpy": np.__version__, "machine": platform.machine(), "cpus": os.cpu_count()}
+
+def compare(results: list, baseline_path: Path, threshold: float) -> list:
+    """Stages at least `threshold` (relative) slower than in the baseline run."""
+    base = {(r["stage"], r["rows"]): r for r in json.loads(baseline_path.read_text())["results"]}
+    regressions = []
+    for r in results:
+        b = base.get((r["stage"], r["rows"]))
+        if b and b["seconds"] > 0 and r["seconds"] > b["seconds"] * (1 + threshold):
+            regressions.append({**r, "baseline_seconds": b["seconds"], "slowdown": r["seconds"] / b["seconds"]})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", type=Path, help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="baseline results file to flag regressions against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown counted as a regression")
+    parser.add_argument("--profile", choices=list(STAGES), help="cProfile a single stage instead of benchmarking")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        profile_stage(args.profile, args.rows[0])
+        return
+
+    results = []
+    for rows in args.rows:
+        path = dataset(rows)
+        df = analytics.load_and_prepare(path) if any(STAGES[s][0] == "frame" for s in args.stages) else None
+        for name in args.stages:
+            kind, fn = STAGES[name]
+            seconds, peak = run_stage(fn, path if kind == "path" else df, args.repeat)
+            results.append({"stage": name, "rows": rows, "seconds": seconds, "peak_bytes": peak,
+                            "rows_per_sec": rows / seconds if seconds else None})
+            print(f"{name:<26} {rows:>12,} rows  {seconds:9.4f}s  {rows / seconds:>14,.0f} rows/s  peak {peak / 2**20:9.1f} MiB")
+
+    out = args.out or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"meta": metadata(), "results": results}, indent=2))
+    print(f"Results written to {out}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['stage']} @ {r['rows']:,} rows: {r['baseline_seconds']:.4f}s -> {r['seconds']:.4f}s "
+                  f"({r['slowdown']:.2f}x)")
+        if regressions:
+            raise SystemExit(1)
+        print(f"No regressions over {args.threshold:.0%} against {args.compare}")
+
+if __name__ == "__main__":
+    main()
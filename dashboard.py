@@ -4,77 +4,66 @@ Produces a 2x2 matplotlib dashboard PNG and PDF from a sales CSV.
 
 Usage:
     1. Place your data as 'sample_sales_data.csv' in same folder (or change DATA_PATH)
-    2. python dashboard.py
+    2. python dashboard.py [--no-cache | --rebuild-cache] [--backend pandas|parallel|compact] [--year Y] [--region R ...]
 Outputs:
     - sales_dashboard.png
     - sales_dashboard.pdf
 """
 
+import argparse
+import sys
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from pathlib import Path
 from datetime import datetime
 from typing import Tuple
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+import analytics
+from analytics import load_and_prepare, kpis, monthly_revenue, revenue_by_region, category_share
+from chart_data import downsample, top_k
+from engine import get_engine, BACKENDS
+from memo import normalize_filters
+from windows import trailing_mean
+
 DATA_PATH = Path("sample_sales_data.csv")
 OUT_PNG = Path("sales_dashboard.png")
 OUT_PDF = Path("sales_dashboard.pdf")
 
 def load_and_clean(path: Path) -> pd.DataFrame:
-    """Load CSV, parse dates, fill/correct columns, add Year/Month columns."""
-    df = pd.read_csv(path)
-    # Standardize column names
-    df.columns = [c.strip() for c in df.columns]
-    # Parse Date
-    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-    # Drop rows with invalid date
-    df = df.dropna(subset=['Date']).copy()
-    # Ensure numeric types
-    for col in ['UnitPrice','Quantity','Revenue']:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-    # If Revenue missing or inconsistent, recalc
-    df['Revenue'] = df.apply(
-        lambda r: round(r['UnitPrice'] * r['Quantity'], 2)
-        if pd.isna(r['Revenue']) or abs(r['Revenue'] - (r['UnitPrice'] * r['Quantity'])) > 0.01
-        else r['Revenue'],
-        axis=1
-    )
-    # Add Year, Month
-    df['Year'] = df['Date'].dt.year
-    df['Month'] = df['Date'].dt.to_period('M').dt.to_timestamp()
-    return df
+    """Load CSV, parse dates, fill/correct columns, add Year/Month columns (the shared analytics.load_and_prepare rules)."""
+    return load_and_prepare(path)
 
 def time_series_summary(df: pd.DataFrame) -> pd.Series:
     """Monthly revenue time series (monthly total)."""
-    ts = df.groupby('Month')['Revenue'].sum().sort_index()
-    return ts
+    return monthly_revenue(df)
 
 def top_products(df: pd.DataFrame, n: int = 10) -> pd.DataFrame:
     """Top N products by revenue."""
-    t = df.groupby('Product')['Revenue'].sum().sort_values(ascending=False).head(n).reset_index()
-    return t
+    return analytics.top_products(df, n=n).reset_index()
 
 def region_summary(df: pd.DataFrame) -> pd.Series:
     """Revenue by region."""
-    return df.groupby('Region')['Revenue'].sum().sort_values(ascending=False)
+    return revenue_by_region(df)
 
 def category_distribution(df: pd.DataFrame) -> pd.Series:
     """Category share (for pie chart)."""
-    return df.groupby('Category')['Revenue'].sum().sort_values(ascending=False)
+    return category_share(df)
 
 def moving_average(series: pd.Series, window: int = 3) -> pd.Series:
-    return series.rolling(window=window, min_periods=1, center=False).mean()
+    return trailing_mean(series, window)
 
 def plot_dashboard(ts: pd.Series, top_prod: pd.DataFrame, region_s: pd.Series, cat_s: pd.Series, out_png: Path, out_pdf: Path):
     """Create a 2x2 dashboard and save to PNG and PDF."""
+    import matplotlib.pyplot as plt  # deferred: most of this script's start-up time
     plt.style.use('default')
     fig, axes = plt.subplots(2, 2, figsize=(14, 10))
     # --- Line chart: Monthly revenue + moving average
     ax = axes[0,0]
-    ax.plot(ts.index, ts.values, marker='o', linewidth=2, label='Monthly Revenue')
     ma = moving_average(ts, window=3)
+    ts = downsample(ts)
+    ma = ma.loc[ts.index]
+    ax.plot(ts.index, ts.values, marker='o', linewidth=2, label='Monthly Revenue')
     ax.plot(ma.index, ma.values, linestyle='--', marker='s', label='3-month MA')
     ax.set_title("Monthly Revenue")
     ax.set_xlabel("Month")
@@ -99,12 +88,7 @@ def plot_dashboard(ts: pd.Series, top_prod: pd.DataFrame, region_s: pd.Series, c
     # --- Pie chart: Category distribution
     ax = axes[1,1]
     # If many categories, group small into 'Other'
-    if len(cat_s) > 6:
-        top = cat_s.head(6)
-        others = cat_s.iloc[6:].sum()
-        pie_series = top.append(pd.Series({'Other': others}))
-    else:
-        pie_series = cat_s
+    pie_series = top_k(cat_s, 6)
     ax.pie(pie_series.values, labels=pie_series.index, autopct='%1.1f%%', startangle=140)
     ax.set_title("Revenue by Category (share)")
     # Layout & save
@@ -115,28 +99,32 @@ def plot_dashboard(ts: pd.Series, top_prod: pd.DataFrame, region_s: pd.Series, c
     print(f"Saved dashboard to {out_png.resolve()} and {out_pdf.resolve()}")
     plt.close(fig)
 
-def summary_text(df: pd.DataFrame) -> str:
+def summary_text(df: pd.DataFrame = None, kp: dict = None) -> str:
     """Return a small textual summary (top-level KPIs)."""
-    total_revenue = df['Revenue'].sum()
-    num_orders = df['OrderID'].nunique() if 'OrderID' in df.columns else len(df)
-    top_product = df.groupby('Product')['Revenue'].sum().idxmax()
-    top_region = df.groupby('Region')['Revenue'].sum().idxmax()
-    return (f"Total revenue: ${total_revenue:,.2f}\n"
-            f"Orders: {num_orders}\n"
-            f"Top product: {top_product}\n"
-            f"Top region: {top_region}\n")
+    kp = kp or kpis(df)
+    return (f"Total revenue: ${kp['total_revenue']:,.2f}\n"
+            f"Orders: {kp['total_orders']}\n"
+            f"Top product: {kp['top_product']}\n"
+            f"Top region: {kp['top_region']}\n")
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the sales dashboard to PNG and PDF.")
+    parser.add_argument("--no-cache", action="store_true", help="parse the CSV directly, bypassing the prepared-data cache")
+    parser.add_argument("--rebuild-cache", action="store_true", help="re-parse the CSV and overwrite its cache entry")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="pandas", help="analytics execution backend")
+    parser.add_argument("--year", type=int, help="only this year")
+    parser.add_argument("--region", nargs="+", help="only these regions")
+    args = parser.parse_args(argv)
     if not DATA_PATH.exists():
         raise SystemExit(f"Data file not found: {DATA_PATH}. Run generate_sample_data.py first or point DATA_PATH to your CSV.")
-    df = load_and_clean(DATA_PATH)
-    print("Loaded data rows:", len(df))
-    print(summary_text(df))
-    ts = time_series_summary(df)
-    tp = top_products(df, n=10)
-    rs = region_summary(df)
-    cs = category_distribution(df)
-    plot_dashboard(ts, tp, rs, cs, OUT_PNG, OUT_PDF)
+    engine = get_engine(DATA_PATH, args.backend, use_cache=not args.no_cache, refresh_cache=args.rebuild_cache)
+    filters = {'Year': args.year, 'Region': args.region}
+    print("Loaded data rows:", engine.count())
+    if engine.count(filters) == 0:
+        raise SystemExit(f"No rows match {normalize_filters(filters)}.")
+    print(summary_text(kp=engine.kpis(filters)))
+    plot_dashboard(engine.monthly_revenue(filters), engine.top_products(filters, n=10).reset_index(),
+                   engine.revenue_by_region(filters), engine.category_share(filters), OUT_PNG, OUT_PDF)
 
 if __name__ == "__main__":
     main()
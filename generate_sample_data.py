@@ -2,13 +2,23 @@
 generate_sample_data.py
 Generates a sample sales CSV for the dashboard.
 Run: python generate_sample_data.py
+
+For load and benchmark testing the same script scales to hundreds of millions of rows:
+rows are generated with vectorized NumPy in fixed-size blocks, seeded per shard, and shards
+are written by a pool of worker processes as CSV or Parquet.
+    python generate_sample_data.py --rows 100000000 --shards 32 --workers 8 --format parquet \
+        --out data/load_test --products 5000 --zipf 1.1 --late-rate 0.02 --dirty-rate 0.001
 """
 
-import csv
-import random
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 OUT = Path("sample_sales_data.csv")
 
 PRODUCTS = [
@@ -26,41 +36,165 @@ PRODUCTS = [
 
 REGIONS = ["North", "South", "East", "West", "Central"]
 SALESPEOPLE = ["Ayesha", "Bilal", "Carlos", "Dina", "Ehsan", "Fatima"]
+CATEGORIES = ["Apparel", "Footwear", "Accessories", "Electronics"]
+COLUMNS = ["OrderID", "Date", "Product", "Category", "UnitPrice", "Quantity", "Revenue", "Region", "Salesperson", "CustomerID"]
 
 NUM_ROWS = 1200
 START_DATE = datetime.now().replace(day=1) - timedelta(days=365)  # one year back
+BLOCK_ROWS = 1_000_000
+
+QTY_VALUES = np.array([1, 2, 3, 4, 5, 10])
+QTY_WEIGHTS = np.array([70, 10, 8, 6, 4, 2]) / 100
 
-def make_row(i):
-    date = START_DATE + timedelta(days=random.randint(0, 364))
-    product, category = random.choice(PRODUCTS)
-    unit_price = round(random.uniform(8, 250), 2)
-    qty = random.choices([1,1,1,2,3,4,5,10], weights=[30,30,10,10,8,6,4,2])[0]
-    revenue = round(unit_price * qty, 2)
-    region = random.choice(REGIONS)
-    salesperson = random.choice(SALESPEOPLE)
-    customer_id = f"C{random.randint(1000,9999)}"
+def make_dimensions(products=len(PRODUCTS), regions=len(REGIONS), salespeople=len(SALESPEOPLE)):
+    """Dimension values; the built-in names come first, larger cardinalities get numbered names."""
+    prods = PRODUCTS[:products] + [(f"Product {i:06d}", CATEGORIES[i % len(CATEGORIES)]) for i in range(len(PRODUCTS), products)]
     return {
-        "OrderID": f"O{100000+i}",
-        "Date": date.strftime("%Y-%m-%d"),
-        "Product": product,
-        "Category": category,
-        "UnitPrice": unit_price,
+        "products": np.array([p for p, _ in prods], dtype=object),
+        "categories": np.array([c for _, c in prods], dtype=object),
+        "regions": np.array((REGIONS + [f"Region {i:03d}" for i in range(len(REGIONS), regions)])[:regions], dtype=object),
+        "salespeople": np.array((SALESPEOPLE + [f"Rep {i:05d}" for i in range(len(SALESPEOPLE), salespeople)])[:salespeople], dtype=object),
+    }
+
+def day_weights(start=START_DATE, days=365, seasonality=0.0) -> np.ndarray:
+    """Relative sales volume of each day in [start, start + days): a yearly sine swing of amplitude `seasonality`."""
+    return 1 + seasonality * np.sin(2 * np.pi * (pd.Timestamp(start).dayofyear + np.arange(days)) / 365.25)
+
+def split_rows(rows, weights, parts):
+    """(day bounds, row counts) of `parts` consecutive day slices, each getting rows in proportion to its weight."""
+    bounds = np.arange(parts + 1) * len(weights) // parts
+    cum = np.concatenate([[0], np.cumsum(weights)])[bounds]
+    return bounds, np.diff(np.round(rows * cum / cum[-1]).astype(np.int64))
+
+def generate_frame(rows, rng, dims, first_order=0, start=START_DATE, days=365, customers=9000,
+                   zipf=0.0, seasonality=0.0, late_rate=0.0, dirty_rate=0.0):
+    """Generate `rows` sales rows with dates drawn from [start, start + days).
+
+    zipf > 0 skews product popularity (rank ** -zipf), seasonality adds a yearly sine swing to daily
+    volume, late_rate moves that share of rows 30-120 days back (they stay at their position in the
+    file, like late-arriving orders), dirty_rate injects bad dates and missing Revenue values.
+    """
+    n_products = len(dims["products"])
+    weights = np.arange(1, n_products + 1, dtype=float) ** -zipf
+    prod = rng.choice(n_products, rows, p=weights / weights.sum())
+
+    weights = day_weights(start, days, seasonality)
+    day = np.sort(rng.choice(days, rows, p=weights / weights.sum()))
+    late = rng.random(rows) < late_rate
+    day[late] -= rng.integers(30, 121, int(late.sum()))
+    dates = (np.datetime64(pd.Timestamp(start).date()) + day).astype(str).astype(object)
+
+    price = np.round(rng.uniform(8, 250, rows), 2)
+    qty = rng.choice(QTY_VALUES, rows, p=QTY_WEIGHTS)
+    revenue = np.round(price * qty, 2)
+
+    if dirty_rate:
+        dirty = np.flatnonzero(rng.random(rows) < dirty_rate)
+        bad_date, no_revenue = dirty[::2], dirty[1::2]
+        dates[bad_date] = rng.choice(["not-a-date", "2025-13-45", ""], len(bad_date))
+        revenue[no_revenue] = np.nan
+
+    return pd.DataFrame({
+        "OrderID": "O" + pd.Series(np.arange(first_order, first_order + rows) + 100000).astype(str),
+        "Date": dates,
+        "Product": dims["products"][prod],
+        "Category": dims["categories"][prod],
+        "UnitPrice": price,
         "Quantity": qty,
         "Revenue": revenue,
-        "Region": region,
-        "Salesperson": salesperson,
-        "CustomerID": customer_id
-    }
+        "Region": dims["regions"][rng.integers(0, len(dims["regions"]), rows)],
+        "Salesperson": dims["salespeople"][rng.integers(0, len(dims["salespeople"]), rows)],
+        "CustomerID": "C" + pd.Series(rng.integers(1000, 1000 + customers, rows)).astype(str),
+    }, columns=COLUMNS)
+
+def write_shard(path, shard, shards, rows, seed=0, fmt="csv", first_order=0, block_rows=BLOCK_ROWS, start=START_DATE,
+                days=365, products=len(PRODUCTS), regions=len(REGIONS), salespeople=len(SALESPEOPLE), **options):
+    """Write one shard; shard k of n covers the k-th slice of the date range, so shards are time-ordered.
+
+    first_order: number of rows in the shards before this one, so OrderIDs stay unique across shards.
+    """
+    dims = make_dimensions(products, regions, salespeople)
+    first_day, last_day = shard * days // shards, (shard + 1) * days // shards
+    # blocks cover consecutive slices of the shard's days, so the file stays (mostly) chronological, and
+    # each slice gets the rows its days' weight calls for, so the seasonal swing carries across blocks
+    weights = day_weights(start, days, options.get("seasonality", 0.0))[first_day:last_day]
+    bounds, counts = split_rows(rows, weights, max(1, min(-(-rows // block_rows), len(weights))))
+    writer = None
+    offset = b = 0
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="") if fmt == "csv" else open(path, "wb") as f:
+        for lo, hi, n in zip(bounds[:-1], bounds[1:], counts):
+            block_start = pd.Timestamp(start) + pd.Timedelta(days=int(first_day + lo))
+            # a slice in a peak season can need more than block_rows rows; it is still written in blocks
+            for part in range(0, n, block_rows):
+                m = int(min(block_rows, n - part))
+                rng = np.random.default_rng([seed, shard, b])
+                df = generate_frame(m, rng, dims, first_order + offset, block_start, int(hi - lo), **options)
+                if fmt == "csv":
+                    df.to_csv(f, index=False, header=(b == 0))
+                else:
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                    writer = writer or pq.ParquetWriter(f, table.schema)
+                    writer.write_table(table)
+                offset += m
+                b += 1
+        if writer is not None:
+            writer.close()
+    return path, rows
+
+def write_dataset(out, rows, shards=1, workers=1, fmt="csv", seed=0, **options):
+    """Write `rows` rows to `out` (a file when shards == 1, otherwise a directory of part files)."""
+    out = Path(out)
+    suffix = "csv" if fmt == "csv" else "parquet"
+    days = options.get("days", 365)
+    if shards > days:
+        raise ValueError(f"{shards} shards need a date range of at least {shards} days, got {days}")
+    if shards == 1:
+        paths = [out]
+    else:
+        paths = [out / f"part-{i:05d}.{suffix}" for i in range(shards)]
+    # the day weights span the whole range, so every shard gets rows in proportion to its season
+    weights = day_weights(options.get("start", START_DATE), days, options.get("seasonality", 0.0))
+    sizes = split_rows(rows, weights, shards)[1].tolist()
+    # each shard's first OrderID is the running total of the rows before it
+    firsts = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(int).tolist()
+    jobs = [(p, i, shards, n, seed, fmt, first) for i, (p, n, first) in enumerate(zip(paths, sizes, firsts))]
+    if workers <= 1 or shards == 1:
+        return [write_shard(*job, **options) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(write_shard, *job, **options) for job in jobs]
+        return [f.result() for f in futures]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic sales data.")
+    parser.add_argument("--rows", type=int, default=NUM_ROWS)
+    parser.add_argument("--out", type=Path, default=OUT, help="output file, or directory when --shards > 1")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=365, help="length of the date range")
+    parser.add_argument("--products", type=int, default=len(PRODUCTS))
+    parser.add_argument("--regions", type=int, default=len(REGIONS))
+    parser.add_argument("--salespeople", type=int, default=len(SALESPEOPLE))
+    parser.add_argument("--customers", type=int, default=9000)
+    parser.add_argument("--zipf", type=float, default=0.0, help="product popularity skew exponent (0 = uniform)")
+    parser.add_argument("--seasonality", type=float, default=0.0, help="amplitude of the yearly volume swing (0-1)")
+    parser.add_argument("--late-rate", type=float, default=0.0, help="share of rows dated 30-120 days earlier")
+    parser.add_argument("--dirty-rate", type=float, default=0.0, help="share of rows with a bad Date or missing Revenue")
+    args = parser.parse_args(argv)
 
-def main():
-    with OUT.open("w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=[
-            "OrderID","Date","Product","Category","UnitPrice","Quantity","Revenue","Region","Salesperson","CustomerID"
-        ])
-        writer.writeheader()
-        for i in range(NUM_ROWS):
-            writer.writerow(make_row(i))
-    print(f"Wrote sample data to {OUT.resolve()} ({NUM_ROWS} rows)")
+    t0 = time.perf_counter()
+    written = write_dataset(args.out, args.rows, shards=args.shards, workers=args.workers, fmt=args.format, seed=args.seed,
+                            days=args.days, products=args.products, regions=args.regions, salespeople=args.salespeople,
+                            customers=args.customers, zipf=args.zipf, seasonality=args.seasonality,
+                            late_rate=args.late_rate, dirty_rate=args.dirty_rate)
+    elapsed = time.perf_counter() - t0
+    print(f"Wrote sample data to {args.out.resolve()} ({args.rows} rows, {len(written)} file(s), "
+          f"{elapsed:.1f}s, {args.rows / max(elapsed, 1e-9):,.0f} rows/s)")
 
 if __name__ == "__main__":
     main()
@@ -1,89 +1,228 @@
 # src/analytics.py
+import io
+import os
 import pandas as pd
-import numpy as np
+from pandas.api.types import union_categoricals
+import parallel
+from compact import CompactTable
 
-def load_and_prepare(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
+# explicit schema for the streaming loader: low-cardinality dimensions as categoricals,
+# narrow measures and a fixed date format so no per-row format inference is needed
+DATE_FORMAT = "%Y-%m-%d"
+CATEGORY_COLUMNS = ['Product', 'Category', 'Region', 'Salesperson', 'CustomerID']
+MEASURE_DTYPES = {'UnitPrice': 'float32', 'Quantity': 'int32', 'Revenue': 'float32'}
+DEFAULT_CHUNKSIZE = 500_000
+
+def load_and_prepare(path: str, chunksize: int = None, compact: bool = False, nbytes: int = None) -> pd.DataFrame:
+    # compact: return a dictionary-encoded CompactTable instead (see compact.py); the analytics
+    # functions below accept either
+    # nbytes: read only the file's first nbytes (whole lines, see complete_lines)
+    if nbytes is not None:
+        with open(path, "rb") as f:
+            path = io.BytesIO(f.read(nbytes))
+    if compact:
+        return CompactTable.from_frame(load_and_prepare(path, chunksize))
+    if chunksize:
+        return _load_chunked(path, chunksize)
+    return prepare_frame(pd.read_csv(path))
+
+# bumped whenever the cleaning rules change, so cached prepared frames are rebuilt (see cache.py)
+load_and_prepare.cache_version = 2
+
+def complete_lines(path, block_size: int = 1 << 16) -> int:
+    """Length in bytes of the file up to and including its last line break.
+
+    A CSV that is being appended to can end in a line that is still being written; reading only this
+    prefix leaves that line for whoever follows the file (see live_tail.CsvTail).
+    """
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(end - block_size, 0)
+            f.seek(start)
+            pos = f.read(end - start).rfind(b"\n")
+            if pos >= 0:
+                return start + pos + 1
+            end = start
+    return 0
+
+def prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Validation/cleaning rules of load_and_prepare, for rows that didn't come from a file."""
     df.columns = [c.strip() for c in df.columns]
     df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
     df = df.dropna(subset=['Date']).copy()
     for col in ['UnitPrice','Quantity','Revenue']:
         if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    fix_revenue(df)
+    for col in ['UnitPrice','Quantity','Revenue']:
+        if col in df.columns:
+            df[col] = df[col].fillna(0)
     df['Year'] = df['Date'].dt.year
     df['Month'] = df['Date'].dt.to_period('M').dt.to_timestamp()
     return df
 
-def kpis(df: pd.DataFrame, freq='M'):
-    total_revenue = df['Revenue'].sum()
-    total_orders = df['OrderID'].nunique() if 'OrderID' in df.columns else len(df)
+def iter_chunks(path: str, chunksize: int = DEFAULT_CHUNKSIZE):
+    """Prepared chunks of a CSV, read with the explicit schema; memory stays bounded by chunksize."""
+    # map stripped names back to the raw header so the dtype schema still applies
+    raw_cols = pd.read_csv(path, nrows=0).columns
+    if hasattr(path, "seek"):
+        path.seek(0)  # a buffer (see load_and_prepare's nbytes) is read again from the start
+    dtype = {raw: 'category' for raw in raw_cols if raw.strip() in CATEGORY_COLUMNS}
+    for chunk in pd.read_csv(path, dtype=dtype, chunksize=chunksize):
+        yield prepare_chunk(chunk)
+
+def _load_chunked(path: str, chunksize: int) -> pd.DataFrame:
+    chunks = list(iter_chunks(path, chunksize))
+    if not chunks:
+        return load_and_prepare(path)
+    return concat_frames(chunks)
+
+def concat_frames(frames: list, ignore_index: bool = False) -> pd.DataFrame:
+    """Concatenate prepared frames; columns categorical in the first one stay categorical over all their values."""
+    # frames carry their own category sets; align them so concat keeps the categorical dtype
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([f[col].astype('category') for f in frames], ignore_order=True).categories
+            for f in frames:
+                f[col] = f[col].astype(pd.CategoricalDtype(categories))
+    return pd.concat(frames, ignore_index=ignore_index)
+
+def prepare_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    chunk.columns = [c.strip() for c in chunk.columns]
+    chunk['Date'] = pd.to_datetime(chunk['Date'], format=DATE_FORMAT, errors='coerce')
+    chunk = chunk.dropna(subset=['Date']).copy()
+    for col in MEASURE_DTYPES:
+        if col in chunk.columns:
+            chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+    fix_revenue(chunk)
+    for col, dtype in MEASURE_DTYPES.items():
+        if col in chunk.columns:
+            chunk[col] = chunk[col].fillna(0).astype(dtype)
+    chunk['Year'] = chunk['Date'].dt.year.astype('int16')
+    chunk['Month'] = chunk['Date'].dt.to_period('M').dt.to_timestamp()
+    return chunk
+
+def fix_revenue(df: pd.DataFrame):
+    """Recompute Revenue as UnitPrice * Quantity (rounded to cents) where it is missing or off by more than a cent."""
+    if not {'UnitPrice', 'Quantity', 'Revenue'} <= set(df.columns):
+        return
+    expected = (df['UnitPrice'].astype('float64') * df['Quantity']).round(2)
+    wrong = df['Revenue'].isna() | ((df['Revenue'] - expected).abs() > 0.01)
+    df['Revenue'] = df['Revenue'].astype('float64').where(~wrong, expected)
+
+def _rows(df: pd.DataFrame, rows, columns):
+    # rows: positions from FilterIndex.select; only the columns a function needs are gathered
+    if rows is None:
+        return df
+    if isinstance(df, CompactTable):
+        return df.take(rows, columns)
+    return df.iloc[rows, [df.columns.get_loc(c) for c in columns if c in df.columns]]
+
+def _sum_by(df: pd.DataFrame, key, workers=None) -> pd.Series:
+    # workers: run the group-by as a parallel partition aggregation (see parallel.py)
+    if isinstance(df, CompactTable):
+        return df.sum_by(key)
+    if workers:
+        return parallel.groupby_sums(df, key, ('Revenue',), workers)['Revenue']
+    return df.groupby(key, observed=True)['Revenue'].sum()
+
+def _nunique(df, col) -> int:
+    return df.nunique(col) if isinstance(df, CompactTable) else df[col].nunique()
+
+def kpis(df: pd.DataFrame, freq='M', orders=None, customers=None, rows=None, workers=None):
+    # orders/customers: precomputed distinct counts (exact or sketched), for inputs such as cube cells
+    df = _rows(df, rows, ['Revenue', 'OrderID', 'CustomerID', 'Product', 'Region', 'Rows'])
+    if workers and not isinstance(df, CompactTable):
+        return _parallel_kpis(df, orders, customers, workers)
+    # accumulate in float64 so float32 measures from the streaming loader don't drift on large tables
+    total_revenue = df['Revenue'].to_numpy().sum(dtype='float64')
+    if orders is not None:
+        total_orders = orders
+    elif 'OrderID' in df.columns:
+        total_orders = _nunique(df, 'OrderID')
+    else:
+        total_orders = df['Rows'].sum() if 'Rows' in df.columns else len(df)
     avg_order_value = total_revenue / (total_orders or 1)
-    top_product = df.groupby('Product')['Revenue'].sum().idxmax()
-    top_region = df.groupby('Region')['Revenue'].sum().idxmax()
+    if customers is None:
+        customers = _nunique(df, 'CustomerID') if 'CustomerID' in df.columns else None
+    top_product = _sum_by(df, 'Product').idxmax()
+    top_region = _sum_by(df, 'Region').idxmax()
     return {
         "total_revenue": float(total_revenue),
         "total_orders": int(total_orders),
         "avg_order_value": float(avg_order_value),
+        "unique_customers": None if customers is None else int(customers),
         "top_product": top_product,
         "top_region": top_region
     }
 
-def monthly_revenue(df: pd.DataFrame):
-    ts = df.groupby(df['Month'])['Revenue'].sum().sort_index()
+def _parallel_kpis(df: pd.DataFrame, orders, customers, workers):
+    by_product = _sum_by(df, 'Product', workers)
+    if orders is None:
+        if 'OrderID' in df.columns:
+            orders = parallel.nunique(df['OrderID'], workers)
+        else:
+            orders = df['Rows'].sum() if 'Rows' in df.columns else len(df)
+    if customers is None and 'CustomerID' in df.columns:
+        customers = parallel.nunique(df['CustomerID'], workers)
+    total_revenue = float(df['Revenue'].to_numpy().sum(dtype='float64'))
+    return {
+        "total_revenue": total_revenue,
+        "total_orders": int(orders),
+        "avg_order_value": total_revenue / (orders or 1),
+        "unique_customers": None if customers is None else int(customers),
+        "top_product": by_product.idxmax(),
+        "top_region": _sum_by(df, 'Region', workers).idxmax()
+    }
+
+def monthly_revenue(df: pd.DataFrame, rows=None, workers=None):
+    df = _rows(df, rows, ['Month', 'Revenue'])
+    ts = _sum_by(df, 'Month', workers).sort_index()
     return ts
 
-def top_products(df: pd.DataFrame, n=10):
-    return df.groupby('Product')['Revenue'].sum().sort_values(ascending=False).head(n)
+def top_products(df: pd.DataFrame, n=10, rows=None, workers=None):
+    df = _rows(df, rows, ['Product', 'Revenue'])
+    return _sum_by(df, 'Product', workers).sort_values(ascending=False).head(n)
 
-def revenue_by_region(df: pd.DataFrame):
-    return df.groupby('Region')['Revenue'].sum().sort_values(ascending=False)
+def revenue_by_region(df: pd.DataFrame, rows=None, workers=None):
+    df = _rows(df, rows, ['Region', 'Revenue'])
+    return _sum_by(df, 'Region', workers).sort_values(ascending=False)
 
-def category_share(df: pd.DataFrame):
-    return df.groupby('Category')['Revenue'].sum().sort_values(ascending=False)
+def category_share(df: pd.DataFrame, rows=None, workers=None):
+    df = _rows(df, rows, ['Category', 'Revenue'])
+    return _sum_by(df, 'Category', workers).sort_values(ascending=False)
 
-def monthly_pivot(df: pd.DataFrame):
-    # pivot product x month revenue (for heatmap)
-    pivot = df.pivot_table(values='Revenue', index='Product', columns=df['Month'].dt.strftime('%Y-%m'), aggfunc='sum', fill_value=0)
+def monthly_pivot(df: pd.DataFrame, rows=None, workers=None):
+    df = _rows(df, rows, ['Product', 'Month', 'Revenue'])
+    if workers or isinstance(df, CompactTable):
+        pivot = _sum_by(df, ['Product', 'Month'], workers).unstack(fill_value=0)
+        pivot.columns = pivot.columns.strftime('%Y-%m').rename('Month')
+        return pivot
+    # pivot product x month revenue (for heatmap); months are labelled after the pivot, once per column
+    pivot = df.pivot_table(values='Revenue', index='Product', columns='Month', aggfunc='sum', fill_value=0, observed=True)
+    pivot.columns = pivot.columns.strftime('%Y-%m').rename('Month')
     return pivot
 
-def top_products_by_region(df: pd.DataFrame, region, n=5):
+def top_products_by_region(df: pd.DataFrame, region, n=5, rows=None, workers=None):
+    df = _rows(df, rows, ['Region', 'Product', 'Revenue'])
     sub = df[df['Region'] == region]
-    return sub.groupby('Product')['Revenue'].sum().sort_values(ascending=False).head(n)
+    return _sum_by(sub, 'Product', workers).sort_values(ascending=False).head(n)
+
+def nunique(df: pd.DataFrame, column, rows=None, workers=None) -> int:
+    """Distinct non-null values of a column (in the selected rows)."""
+    df = _rows(df, rows, [column])
+    if workers and not isinstance(df, CompactTable):
+        return parallel.nunique(df[column], workers)
+    return int(_nunique(df, column))
 
 def percent_change(current: float, previous: float):
     if previous == 0:
         return None
     return (current - previous) / previous * 100.0
 
-def auto_insights(df: pd.DataFrame):
-    insights = []
-    try:
-        # top product change month over month
-        monthly = df.groupby([df['Month'].dt.to_period('M'),'Product'])['Revenue'].sum().unstack(fill_value=0)
-        months = monthly.index.sort_values()
-        if len(months) >= 2:
-            last, prev = months[-1], months[-2]
-            last_s = monthly.loc[last]
-            prev_s = monthly.loc[prev]
-            top_last = last_s.idxmax()
-            change = percent_change(last_s[top_last], prev_s.get(top_last, 0))
-            if change is not None:
-                insights.append(f"Top product in {last.strftime('%b %Y')} was **{top_last}** with revenue ${last_s[top_last]:,.0f} ({change:+.1f}% vs previous month).")
-        # region share
-        region = df.groupby('Region')['Revenue'].sum().sort_values(ascending=False)
-        if not region.empty:
-            top_reg = region.index[0]
-            insights.append(f"Top region: **{top_reg}** contributing {region.iloc[0]/region.sum()*100:.1f}% of total revenue.")
-        # fastest growing product last 3 months
-        monthly_total = df.groupby([df['Month'].dt.to_period('M'),'Product'])['Revenue'].sum().unstack(fill_value=0)
-        if monthly_total.shape[0] >= 4:
-            last3 = monthly_total.iloc[-3:].sum()
-            prev3 = monthly_total.iloc[-6:-3].sum()
-            growth = ((last3 - prev3) / (prev3.replace(0, np.nan))).replace([np.inf, -np.inf], np.nan)
-            growth = growth.dropna().sort_values(ascending=False)
-            if not growth.empty:
-                prod = growth.index[0]
-                insights.append(f"Fastest growing product (last 3 months vs previous 3 months): **{prod}** (+{growth.iloc[0]:.1%}).")
-    except Exception:
-        pass
-    return insights
+def auto_insights(df: pd.DataFrame, rows=None):
+    # single-pass matrix engine lives in insights.py (imported here to avoid a circular import)
+    from insights import insights_report
+    df = _rows(df, rows, ['Month', 'Product', 'Region', 'Revenue'])
+    return [i['text'] for i in insights_report(df) if i['text']]
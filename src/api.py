@@ -0,0 +1,161 @@
+# src/api.py
+# Headless dashboard-data HTTP API.
+#
+# Serves the analytics aggregates as JSON so BI tools and alerting can reuse them. One prepared copy
+# of the dataset (plus its cube, sketches and filter index) is held in memory; responses are cached
+# in the shared MemoCache by endpoint, normalized filters and dataset version, and carry a strong
+# ETag so clients revalidating with If-None-Match get a 304 without a body. The source file is
+# re-fingerprinted periodically and a new version is loaded in the background, which retires the
+# cached responses of the old one.
+#
+# Run: python src/api.py data/sample_sales_data.csv --port 8080
+#      curl 'http://127.0.0.1:8080/top_products?year=2025&region=North&region=East&n=5'
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+from engine import Engine, get_engine, BACKENDS
+from memo import MEMO, normalize_filters
+
+RELOAD_INTERVAL = 10.0  # seconds between checks of the source file
+
+# LIVE holds the current Engine; the watcher swaps it in place when the source file changes
+CONFIG = web.AppKey("config", dict)
+LIVE = web.AppKey("live", dict)
+WATCH = web.AppKey("watch", asyncio.Task)
+
+def _jsonable(obj):
+    if isinstance(obj, pd.DataFrame):
+        return {"index": [_label(v) for v in obj.index], "columns": [_label(v) for v in obj.columns],
+                "data": obj.to_numpy(dtype=float).tolist()}
+    if isinstance(obj, pd.Series):
+        return [{"label": _label(k), "value": float(v)} for k, v in obj.items()]
+    if isinstance(obj, dict):
+        return {k: _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    return _label(obj)
+
+def _label(value):
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def parse_filters(query) -> dict:
+    """{'Year', 'Region', 'Product'} from repeated or comma-separated year/region(s)/product(s) parameters."""
+    def values(*names):
+        out = []
+        for name in names:
+            for raw in query.getall(name, []):
+                out.extend(v.strip() for v in raw.split(",") if v.strip())
+        return out
+    try:
+        years = [int(y) for y in values("year", "years")]
+    except ValueError:
+        raise web.HTTPBadRequest(text="year must be an integer")
+    return {'Year': years, 'Region': values("region", "regions"), 'Product': values("product", "products")}
+
+def _int_param(query, name, default):
+    try:
+        return int(query.get(name, default))
+    except ValueError:
+        raise web.HTTPBadRequest(text=f"{name} must be an integer")
+
+# endpoint -> fn(engine, filters, query) returning something _jsonable understands
+def _kpis(ds, filters, query):
+    # ?exact=1 forces exact distinct counts; otherwise the engine's policy applies
+    exact = query.get("exact", "0").lower() in ("1", "true", "yes")
+    return ds.kpis(filters, exact=True if exact else None)
+
+ENDPOINTS = {
+    "kpis": _kpis,
+    "monthly_revenue": lambda ds, f, q: ds.monthly_revenue(f),
+    "top_products": lambda ds, f, q: ds.top_products(f, n=_int_param(q, "n", 10)),
+    "revenue_by_region": lambda ds, f, q: ds.revenue_by_region(f),
+    "category_share": lambda ds, f, q: ds.category_share(f),
+    "monthly_pivot": lambda ds, f, q: ds.monthly_pivot(f),
+    "auto_insights": lambda ds, f, q: ds.auto_insights(f),
+}
+# query parameters (besides the filters) that change a response, and so belong in its cache key
+PARAMS = {"kpis": ("exact",), "top_products": ("n",)}
+
+def render(ds: Engine, endpoint: str, filters: dict, query) -> tuple:
+    """(body, etag) for one request, computed once per dataset version, endpoint and normalized filters."""
+    params = tuple((p, query.get(p)) for p in PARAMS.get(endpoint, ()))
+    key = ('api', endpoint, normalize_filters(filters), params)
+
+    def compute():
+        empty = ds.count(filters) == 0
+        result = None if empty and endpoint == "kpis" else ENDPOINTS[endpoint](ds, filters, query)
+        body = json.dumps({"version": ds.version.rsplit("|", 1)[-1], "endpoint": endpoint,
+                           "filters": {k: v for k, v in normalize_filters(filters)}, "data": _jsonable(result)}).encode()
+        return body, '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+    return MEMO.get_or_compute(key, ds.path, ds.version, compute)
+
+async def handle(request: web.Request) -> web.Response:
+    endpoint = request.match_info["endpoint"]
+    if endpoint not in ENDPOINTS:
+        raise web.HTTPNotFound(text=f"unknown endpoint {endpoint!r}; available: {', '.join(ENDPOINTS)}")
+    ds = request.app[LIVE]["dataset"]
+    filters = parse_filters(request.query)
+    # runs off the event loop so a cache miss computing in pandas doesn't stall other requests
+    body, etag = await asyncio.to_thread(render, ds, endpoint, filters, request.query)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in {t.strip() for t in request.headers.get("If-None-Match", "").split(",")}:
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=body, content_type="application/json", headers=headers)
+
+async def health(request: web.Request) -> web.Response:
+    ds = request.app[LIVE]["dataset"]
+    return web.json_response({"rows": ds.count(), "version": ds.version.rsplit("|", 1)[-1],
+                              "endpoints": list(ENDPOINTS), "cache": MEMO.stats()})
+
+async def _watch(app: web.Application):
+    """Swap in the shared engine for the source file when it has been rebuilt for new content."""
+    config, live = app[CONFIG], app[LIVE]
+    while True:
+        await asyncio.sleep(config["reload_interval"])
+        try:
+            t0 = time.perf_counter()
+            engine = await asyncio.to_thread(lambda: get_engine(config["path"], config["backend"]).warm())
+            if engine is not live["dataset"]:
+                live["dataset"] = engine
+                print(f"Reloaded {config['path']} in {time.perf_counter() - t0:.2f}s")
+        except OSError as e:
+            print(f"Reload check failed: {e}")
+
+async def _start_watch(app: web.Application):
+    app[WATCH] = asyncio.create_task(_watch(app))
+
+async def _stop_watch(app: web.Application):
+    app[WATCH].cancel()
+
+def create_app(path, reload_interval: float = RELOAD_INTERVAL, backend: str = "pandas") -> web.Application:
+    app = web.Application()
+    app[CONFIG] = {"path": str(path), "reload_interval": reload_interval, "backend": backend}
+    app[LIVE] = {"dataset": get_engine(path, backend).warm()}
+    app.router.add_get("/health", health)
+    app.router.add_get("/{endpoint}", handle)
+    if reload_interval:
+        app.on_startup.append(_start_watch)
+        app.on_cleanup.append(_stop_watch)
+    return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the dashboard aggregates as JSON over HTTP.")
+    parser.add_argument("data_path", nargs="?", default="data/sample_sales_data.csv")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--reload-interval", type=float, default=RELOAD_INTERVAL,
+                        help="seconds between checks for a changed source file (0 disables)")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="pandas", help="analytics execution backend")
+    args = parser.parse_args()
+    web.run_app(create_app(args.data_path, args.reload_interval, args.backend), host=args.host, port=args.port)
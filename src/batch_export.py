@@ -0,0 +1,93 @@
+# src/batch_export.py
+# Nightly batch export: one static dashboard per filter spec, rendered in a process pool.
+#
+# The dataset is loaded and aggregated once in the parent by the shared Engine (the same numbers the
+# dashboards and the API show); workers only receive the small per-report aggregates and draw them
+# with the Agg backend.
+#
+# Run: python src/batch_export.py --by Region Year Salesperson --formats png pdf svg --workers 8
+#      python src/batch_export.py --specs specs.json   # [{"name": "north-2025", "filters": {"Region": "North", "Year": 2025}}]
+import os
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import argparse
+import json
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from dashboard_static import render_static_dashboard
+from engine import get_engine, BACKENDS
+
+def _slug(value) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", str(value)).strip("-").lower()
+
+def expand_specs(engine, by) -> list:
+    """One spec for the whole dataset plus one per value of every column in `by`."""
+    specs = [{"name": "all", "filters": {}}]
+    for col in by:
+        for value in engine.options(col):
+            specs.append({"name": f"{_slug(col)}-{_slug(value)}", "filters": {col: value.item() if hasattr(value, "item") else value}})
+    return specs
+
+def report_aggregates(engine, filters):
+    """Engine.dashboard_aggregates for one filter spec, or None if no rows match."""
+    return None if engine.count(filters) == 0 else engine.dashboard_aggregates(filters)
+
+def compute_jobs(engine, specs) -> list:
+    """(spec, aggregates) for every spec with data."""
+    jobs = []
+    for spec in specs:
+        aggs = report_aggregates(engine, spec.get("filters", {}))
+        if aggs is not None:
+            jobs.append((spec, aggs))
+    return jobs
+
+def _render_job(name, aggs, paths, dpi):
+    t0 = time.perf_counter()
+    render_static_dashboard(aggs, paths, dpi=dpi, title=f"Sales Data Dashboard — {name}")
+    return {"name": name, "seconds": time.perf_counter() - t0, "outputs": [str(p) for p in paths], "pid": os.getpid()}
+
+def run_batch(engine, specs, out_dir, formats=("png",), workers=None, dpi=300) -> list:
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    jobs = compute_jobs(engine, specs)
+    print(f"Aggregated {len(jobs)} reports in {time.perf_counter() - t0:.2f}s")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_render_job, spec["name"], aggs, [out_dir / f"{spec['name']}.{fmt}" for fmt in formats], dpi)
+                   for spec, aggs in jobs]
+        for fut in as_completed(futures):
+            r = fut.result()
+            results.append(r)
+            print(f"  {r['name']:<40} {r['seconds']:6.2f}s  (worker {r['pid']})")
+    elapsed = time.perf_counter() - t0
+    print(f"Rendered {len(results)} reports x {len(formats)} formats with {workers} workers in {elapsed:.2f}s "
+          f"({len(results) / elapsed:.1f} reports/s)")
+    (out_dir / "manifest.json").write_text(json.dumps({"workers": workers, "seconds": elapsed, "jobs": results}, indent=2))
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render one static dashboard per filter spec in parallel.")
+    parser.add_argument("data_path", nargs="?", default="data/sample_sales_data.csv")
+    parser.add_argument("--specs", type=Path, help="JSON list of {name, filters} specs")
+    parser.add_argument("--by", nargs="*", default=[], help="also emit one report per value of these columns")
+    parser.add_argument("--formats", nargs="+", default=["png"], choices=["png", "pdf", "svg"])
+    parser.add_argument("--out", default="exports")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: CPU count)")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--no-cache", action="store_true", help="parse the CSV directly, bypassing the prepared-data cache")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="pandas", help="analytics execution backend")
+    args = parser.parse_args(argv)
+
+    engine = get_engine(args.data_path, args.backend, use_cache=not args.no_cache)
+    specs = json.loads(args.specs.read_text()) if args.specs else []
+    if args.by or not specs:
+        specs += expand_specs(engine, args.by)
+    run_batch(engine, specs, args.out, formats=args.formats, workers=args.workers, dpi=args.dpi)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# src/cache.py
+# Persistent columnar cache of prepared datasets.
+#
+# The output of a loader (load_and_prepare / load_and_clean) is stored as an uncompressed
+# Arrow IPC (Feather v2) file so later runs get a memory-mapped read instead of CSV parsing.
+# Entries are keyed by the source path, its size, a content hash and the loader (including its
+# cache_version attribute, bumped when its cleaning rules change); the mtime is only used
+# to decide when the hash has to be recomputed, so touching a file without changing it
+# still hits the cache.
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+CACHE_DIR = Path(os.environ.get("SALES_CACHE_DIR", ".cache/prepared"))
+MAX_CACHE_BYTES = int(os.environ.get("SALES_CACHE_MAX_BYTES", 2 * 1024**3))
+_HASH_INDEX = "hashes.json"
+
+def content_hash(path, block_size: int = 1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def fingerprint(path, cache_dir=CACHE_DIR) -> str:
+    """Stable identifier of the source file: resolved path, size and content hash."""
+    path = Path(path).resolve()
+    st = path.stat()
+    index_path = Path(cache_dir) / _HASH_INDEX
+    try:
+        index = json.loads(index_path.read_text())
+    except (OSError, ValueError):
+        index = {}
+    entry = index.get(str(path))
+    if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+        digest = entry["hash"]
+    else:
+        digest = content_hash(path)
+        index[str(path)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest}
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        index_path.write_text(json.dumps(index))
+    return f"{path}|{st.st_size}|{digest}"
+
+def load_cached(path, loader, cache_dir=CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES,
+                enabled: bool = True, refresh: bool = False, **loader_kwargs) -> pd.DataFrame:
+    """Return loader(path, **loader_kwargs), served from the on-disk cache when possible.
+
+    enabled=False bypasses the cache entirely; refresh=True rebuilds the entry.
+    Without pyarrow the loader is simply called.
+    """
+    if not enabled:
+        return loader(path, **loader_kwargs)
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError:
+        return loader(path, **loader_kwargs)
+
+    cache_dir = Path(cache_dir)
+    key_src = "|".join([fingerprint(path, cache_dir), loader.__module__, loader.__qualname__,
+                        str(getattr(loader, "cache_version", 0)), repr(sorted(loader_kwargs.items()))])
+    target = cache_dir / (hashlib.blake2b(key_src.encode(), digest_size=16).hexdigest() + ".arrow")
+
+    if target.exists() and not refresh:
+        os.utime(target)  # bump for LRU eviction
+        return feather.read_table(target, memory_map=True).to_pandas()
+
+    df = loader(path, **loader_kwargs)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(f".{os.getpid()}.tmp")
+    feather.write_feather(pa.Table.from_pandas(df, preserve_index=True), tmp, compression="uncompressed")
+    os.replace(tmp, target)
+    evict(cache_dir, max_bytes, keep=target)
+    return df
+
+def evict(cache_dir=CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES, keep=None):
+    """Delete least recently used cache entries until the directory fits in max_bytes."""
+    entries = sorted(Path(cache_dir).glob("*.arrow"), key=lambda p: p.stat().st_mtime)
+    total = sum(p.stat().st_size for p in entries)
+    for p in entries:
+        if total <= max_bytes:
+            break
+        if keep is not None and p == Path(keep):
+            continue
+        total -= p.stat().st_size
+        p.unlink(missing_ok=True)
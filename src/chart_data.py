@@ -0,0 +1,100 @@
+# src/chart_data.py
+# Chart data preparation between the analytics functions and the renderers.
+#
+# Aggregates are sized by the data (thousands of SKUs, daily dates); charts are sized by the screen.
+# Everything here bounds what a renderer receives: heatmaps keep the top-k rows plus an "Other"
+# bucket, time series pick day/week/month granularity for a point budget and long series are
+# thinned with Largest-Triangle-Three-Buckets, which keeps the visual peaks and troughs.
+# log_payload records how large each chart ends up (at DEBUG level, since measuring costs a serialization).
+import logging
+
+import numpy as np
+import pandas as pd
+
+HEATMAP_ROWS = 25
+PIE_SLICES = 8
+POINT_BUDGET = 400
+OTHER = "Other"
+
+log = logging.getLogger(__name__)
+
+def top_k(series: pd.Series, k: int, other: str = OTHER) -> pd.Series:
+    """Largest k values (descending) plus one `other` entry summing the rest."""
+    series = series.sort_values(ascending=False)
+    if len(series) <= k:
+        return series
+    values = np.append(series.iloc[:k].to_numpy(), series.iloc[k:].sum())
+    return pd.Series(values, index=pd.Index(list(series.index[:k]) + [other], name=series.index.name), name=series.name)
+
+def cap_rows(pivot: pd.DataFrame, k: int = HEATMAP_ROWS, other: str = OTHER) -> pd.DataFrame:
+    """Heatmap matrix limited to the k rows with the largest totals plus an `other` row for the rest."""
+    if len(pivot) <= k:
+        return pivot
+    order = pivot.sum(axis=1).sort_values(ascending=False).index
+    top = pivot.loc[order[:k]]
+    capped = pd.concat([top, pivot.loc[order[k:]].sum().to_frame(other).T])
+    capped.index = pd.Index(list(top.index) + [other], name=pivot.index.name)
+    return capped
+
+def granularity(start, end, budget: int = POINT_BUDGET) -> str:
+    """Finest of day/week/month that covers [start, end] in at most `budget` points."""
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    if days <= budget:
+        return 'D'
+    if days / 7 <= budget:
+        return 'W'
+    return 'M'
+
+def revenue_series(df: pd.DataFrame, budget: int = POINT_BUDGET) -> pd.Series:
+    """Revenue over time at an adaptive granularity; monthly for inputs without Date (e.g. cube cells)."""
+    if 'Date' not in df.columns:
+        return downsample(df.groupby('Month', observed=True)['Revenue'].sum().sort_index(), budget)
+    if df.empty:
+        return pd.Series(dtype=float, name='Revenue')
+    freq = granularity(df['Date'].min(), df['Date'].max(), budget)
+    period = df['Date'].dt.to_period(freq).dt.start_time.rename('Date')
+    return downsample(df.groupby(period)['Revenue'].sum().sort_index(), budget)
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the Largest-Triangle-Three-Buckets selection of `threshold` points (first and last kept)."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)  # threshold - 2 buckets between the end points
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # the next bucket's average stands in for the point that will be chosen there
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+def downsample(series: pd.Series, budget: int = POINT_BUDGET) -> pd.Series:
+    """Series thinned to at most `budget` points with LTTB (unchanged if already small enough)."""
+    if len(series) <= budget:
+        return series
+    index = series.index
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else np.arange(len(series))
+    return series.iloc[lttb(x, series.to_numpy(dtype=np.float64), budget)]
+
+def log_payload(name: str, chart):
+    """Log and return the size of a chart: serialized JSON for Plotly figures, data bytes otherwise.
+
+    Measuring a figure serializes it, so nothing is measured (and None is returned) unless DEBUG is enabled.
+    """
+    if not log.isEnabledFor(logging.DEBUG):
+        return None
+    if isinstance(chart, (pd.Series, pd.DataFrame)):
+        size = int(np.sum(chart.memory_usage(deep=True)))
+    elif hasattr(chart, "to_json"):
+        size = len(chart.to_json())
+    else:
+        size = int(np.asarray(chart).nbytes)
+    log.debug("chart %s: %s bytes", name, f"{size:,}")
+    return size
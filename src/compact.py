@@ -0,0 +1,181 @@
+# src/compact.py
+# Compact dictionary-encoded fact table.
+#
+# Dimension columns are stored as small integer codes into sorted label arrays, Date and Month as
+# int32 day/month ordinals (days and months since 1970-01), measures as float32/int32 and OrderID as
+# a number when every ID is a shared prefix plus digits. Category is not stored per row when each
+# Product has a single Category: it is looked up from the product code. Group-bys run on the codes
+# with np.bincount and only the result labels are decoded; table[col] decodes a column on demand
+# (dimensions come back as categoricals, so the analytics functions can read them as usual).
+#
+# Run: python src/compact.py sample_sales_data.csv   (bytes per row, prepared frame vs compact)
+import re
+
+import numpy as np
+import pandas as pd
+
+MEASURE_DTYPES = {'UnitPrice': np.float32, 'Quantity': np.int32, 'Revenue': np.float32}
+_NUMBERED_ID = re.compile(r"^(\D*)([1-9]\d{0,17})$")
+
+def _encode(values: pd.Series):
+    codes, labels = pd.factorize(values, sort=True)
+    return codes.astype(np.min_scalar_type(-max(len(labels), 1))), np.asarray(labels, dtype=object)
+
+def _numbered_ids(values: pd.Series):
+    """(prefix, int64 numbers) if every ID is one shared prefix + digits without leading zeros, else None."""
+    parts = values.astype(str).str.extract(_NUMBERED_ID)
+    if parts[0].isna().any() or parts[0].nunique() != 1:
+        return None
+    return parts[0].iloc[0], parts[1].astype(np.int64).to_numpy()
+
+class CompactTable:
+    def __init__(self, n: int, columns: list, codes: dict, labels: dict, measures: dict,
+                 day: np.ndarray, month: np.ndarray, order_ids=None, category_of_product=None):
+        self.n = n
+        self._columns = columns
+        self.codes, self.labels, self.measures = codes, labels, measures
+        self.day, self.month = day, month
+        self.order_ids = order_ids  # (prefix, int64 numbers) when OrderID is stored numerically
+        self.category_of_product = category_of_product  # Category code per Product code
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "CompactTable":
+        """Encode a prepared frame (output of load_and_prepare)."""
+        codes, labels, measures, order_ids = {}, {}, {}, None
+        for col in df.columns:
+            if col in ('Date', 'Year', 'Month'):
+                continue
+            if col in MEASURE_DTYPES:
+                measures[col] = df[col].to_numpy(dtype=MEASURE_DTYPES[col])
+            elif col == 'OrderID' and (order_ids := _numbered_ids(df[col])) is not None:
+                pass
+            else:
+                codes[col], labels[col] = _encode(df[col])
+        category_of_product = None
+        if 'Product' in codes and 'Category' in codes:
+            pairs = pd.DataFrame({'p': codes['Product'], 'c': codes['Category']}).drop_duplicates()
+            if pairs['p'].is_unique and (pairs['p'] >= 0).all():
+                category_of_product = np.full(len(labels['Product']), -1, dtype=codes['Category'].dtype)
+                category_of_product[pairs['p'].to_numpy()] = pairs['c'].to_numpy()
+                del codes['Category']
+        dates = df['Date'].to_numpy(dtype='datetime64[D]')
+        return cls(len(df), list(df.columns), codes, labels, measures,
+                   dates.astype(np.int32), dates.astype('datetime64[M]').astype(np.int32),
+                   order_ids, category_of_product)
+
+    # ---- frame-like access -------------------------------------------------------------------
+    @property
+    def columns(self) -> pd.Index:
+        return pd.Index(self._columns)
+
+    @property
+    def empty(self) -> bool:
+        return self.n == 0
+
+    def __len__(self):
+        return self.n
+
+    def _dim_codes(self, col) -> np.ndarray:
+        if col == 'Category' and self.category_of_product is not None:
+            # -1 (missing product) indexes the appended -1
+            return np.append(self.category_of_product, -1)[self.codes['Product']]
+        return self.codes[col]
+
+    def __getitem__(self, key):
+        if not isinstance(key, str):
+            return self.take(np.flatnonzero(np.asarray(key, dtype=bool)))
+        if key in self.measures:
+            return pd.Series(self.measures[key], name=key)
+        if key == 'Date':
+            return pd.Series(self.day.astype('datetime64[D]').astype('datetime64[ns]'), name=key)
+        if key == 'Month':
+            return pd.Series(self.month.astype('datetime64[M]').astype('datetime64[ns]'), name=key)
+        if key == 'Year':
+            return pd.Series((self.month // 12 + 1970).astype(np.int16), name=key)
+        if key == 'OrderID' and self.order_ids is not None:
+            prefix, numbers = self.order_ids
+            return pd.Series(prefix + pd.Series(numbers).astype(str), name=key)
+        if key not in self.labels:
+            raise KeyError(key)
+        return pd.Series(pd.Categorical.from_codes(self._dim_codes(key), categories=self.labels[key]), name=key)
+
+    def take(self, rows, columns=None) -> "CompactTable":
+        """Table of the given row positions (columns, if given, limits what is gathered)."""
+        keep = (lambda c: True) if columns is None else (lambda c: c in columns)
+        codes = {c: v[rows] for c, v in self.codes.items() if keep(c) or (c == 'Product' and keep('Category'))}
+        order_ids = None
+        if self.order_ids is not None and keep('OrderID'):
+            order_ids = (self.order_ids[0], self.order_ids[1][rows])
+        return CompactTable(len(rows), [c for c in self._columns if keep(c)], codes, self.labels,
+                            {c: v[rows] for c, v in self.measures.items() if keep(c)},
+                            self.day[rows], self.month[rows], order_ids, self.category_of_product)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({c: self[c] for c in self._columns})
+
+    # ---- aggregation on codes -----------------------------------------------------------------
+    def _key(self, col):
+        """(codes, number of bins, decode(bin positions) -> labels) for a group-by key."""
+        if col in ('Month', 'Year'):
+            values = self.month if col == 'Month' else self.month // 12
+            lo = int(values.min()) if self.n else 0
+            if col == 'Month':
+                decode = lambda idx: pd.DatetimeIndex((idx + lo).astype('datetime64[M]').astype('datetime64[ns]'), name=col)
+            else:
+                decode = lambda idx: pd.Index(idx + lo + 1970, name=col)
+            return values - lo, (int(values.max()) - lo + 1) if self.n else 1, decode
+        labels = self.labels[col]
+        return self._dim_codes(col), max(len(labels), 1), lambda idx: pd.Index(labels[idx], name=col)
+
+    def sum_by(self, keys, measure: str = 'Revenue') -> pd.Series:
+        """df.groupby(keys, observed=True)[measure].sum(), computed with bincount on the codes."""
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        parts = [self._key(k) for k in keys]
+        combined = np.zeros(self.n, dtype=np.int64)
+        missing = np.zeros(self.n, dtype=bool)
+        for codes, size, _ in parts:
+            combined = combined * size + codes
+            missing |= codes < 0
+        combined = combined[~missing]  # missing keys are dropped, like pandas' dropna=True
+        nbins = int(np.prod([size for _, size, _ in parts]))
+        sums = np.bincount(combined, weights=self.measures[measure][~missing], minlength=nbins)
+        present = np.flatnonzero(np.bincount(combined, minlength=nbins))
+        positions = np.unravel_index(present, [size for _, size, _ in parts])
+        levels = [decode(pos) for (_, _, decode), pos in zip(parts, positions)]
+        index = levels[0] if len(levels) == 1 else pd.MultiIndex.from_arrays(levels)
+        return pd.Series(sums[present], index=index, name=measure)
+
+    def nunique(self, col) -> int:
+        if col == 'OrderID' and self.order_ids is not None:
+            return len(np.unique(self.order_ids[1]))
+        codes = self._dim_codes(col)
+        return int(np.count_nonzero(np.bincount(codes[codes >= 0], minlength=len(self.labels[col]))))
+
+    # ---- size --------------------------------------------------------------------------------
+    @property
+    def nbytes(self) -> int:
+        arrays = [*self.codes.values(), *self.measures.values(), self.day, self.month]
+        if self.order_ids is not None:
+            arrays.append(self.order_ids[1])
+        labels = sum(pd.Series(v).memory_usage(deep=True) for v in self.labels.values())
+        lookup = self.category_of_product.nbytes if self.category_of_product is not None else 0
+        return sum(a.nbytes for a in arrays) + int(labels) + lookup
+
+def bytes_per_row(df: pd.DataFrame, table: CompactTable = None) -> dict:
+    """Deep memory per row of the prepared frame vs its compact encoding."""
+    table = table if table is not None else CompactTable.from_frame(df)
+    rows = max(len(df), 1)
+    frame = int(df.memory_usage(deep=True, index=True).sum())
+    return {"rows": len(df), "frame_bytes_per_row": frame / rows, "compact_bytes_per_row": table.nbytes / rows,
+            "ratio": frame / max(table.nbytes, 1)}
+
+if __name__ == "__main__":
+    import argparse
+    from analytics import load_and_prepare
+    parser = argparse.ArgumentParser(description="Report bytes per row of the prepared frame vs the compact table.")
+    parser.add_argument("csv")
+    parser.add_argument("--chunksize", type=int, help="load with the typed chunked loader instead")
+    args = parser.parse_args()
+    report = bytes_per_row(load_and_prepare(args.csv, chunksize=args.chunksize))
+    print(f"{report['rows']:,} rows: {report['frame_bytes_per_row']:.1f} B/row prepared frame, "
+          f"{report['compact_bytes_per_row']:.1f} B/row compact ({report['ratio']:.1f}x smaller)")
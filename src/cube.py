@@ -0,0 +1,51 @@
+# src/cube.py
+# Pre-aggregated sales cube.
+#
+# One group-by over the fact table produces Month x Year x Region x Product x Category x Salesperson
+# cells holding Revenue, Quantity and row counts. The cells keep the fact table's column names, so every
+# function in analytics.py runs on them unchanged (sums of sums are sums); only distinct counts such as
+# OrderID still need the raw rows.
+import pandas as pd
+
+CUBE_DIMENSIONS = ['Month', 'Year', 'Region', 'Product', 'Category', 'Salesperson']
+CUBE_MEASURES = ['Revenue', 'Quantity']
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    dims = [c for c in CUBE_DIMENSIONS if c in df.columns]
+    measures = [c for c in CUBE_MEASURES if c in df.columns]
+    grouped = df.groupby(dims, observed=True, sort=False, dropna=False)
+    cube = grouped[measures].sum()
+    cube['Rows'] = grouped.size()
+    # cells are few, so widen measures back to float64 for stable totals
+    return cube.astype({m: 'float64' for m in measures}).reset_index()
+
+def filter_values(value):
+    """Normalize one filter value to a list, or None when it doesn't restrict anything.
+
+    None, empty lists and lists containing "All" leave that column unfiltered.
+    """
+    if value is None:
+        return None
+    values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+    return None if not values or "All" in values else values
+
+def apply_filters(df: pd.DataFrame, filters: dict = None) -> pd.DataFrame:
+    """Filter raw rows or cube cells by {column: value or list of values}."""
+    mask = None
+    for col, value in (filters or {}).items():
+        values = filter_values(value)
+        if values is None:
+            continue
+        m = df[col].isin(values)
+        mask = m if mask is None else mask & m
+    return df if mask is None else df[mask]
+
+def merge_cubes(*cubes: pd.DataFrame) -> pd.DataFrame:
+    """Combine cubes built from disjoint sets of rows (e.g. successive batches) into one."""
+    cubes = [c for c in cubes if c is not None and not c.empty]
+    if not cubes:
+        return pd.DataFrame(columns=CUBE_DIMENSIONS + CUBE_MEASURES + ['Rows'])
+    combined = pd.concat(cubes, ignore_index=True)
+    dims = [c for c in CUBE_DIMENSIONS if c in combined.columns]
+    values = [c for c in combined.columns if c not in dims]
+    return combined.groupby(dims, observed=True, sort=False, dropna=False)[values].sum().reset_index()
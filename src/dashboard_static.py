@@ -1,20 +1,63 @@
 # src/dashboard_static.py
-import matplotlib.pyplot as plt
-import seaborn as sns
-from analytics import load_and_prepare, kpis, monthly_revenue, top_products, revenue_by_region, category_share, monthly_pivot
+# matplotlib and seaborn are imported inside render_static_dashboard: they dominate the import time
+# of this module, and callers that only need dashboard_aggregates (or never export) shouldn't pay it.
+import argparse
+import io
+from analytics import kpis, monthly_revenue, top_products, revenue_by_region, category_share, monthly_pivot
+from engine import get_engine
+from windows import trailing_mean
+from chart_data import cap_rows, downsample, top_k, log_payload, PIE_SLICES
 import pandas as pd
 
-def create_static_dashboard(data_path: str, out_path="sales_dashboard_portfolio.png"):
-    df = load_and_prepare(data_path)
-    KP = kpis(df)
-    ts = monthly_revenue(df)
-    top5 = top_products(df, n=5)
-    reg = revenue_by_region(df)
-    cat = category_share(df)
-    pivot = monthly_pivot(df)
+def create_static_dashboard(data, out_path="sales_dashboard_portfolio.png", use_cache=True, refresh_cache=False, fmt="png", dpi=300):
+    """data: CSV path, prepared DataFrame or dashboard_aggregates() dict.
+
+    With out_path=None nothing touches the disk and the encoded image is returned as bytes.
+    """
+    if isinstance(data, dict):
+        aggs = data
+    elif isinstance(data, pd.DataFrame):
+        aggs = dashboard_aggregates(data)
+    else:
+        aggs = get_engine(data, use_cache=use_cache, refresh_cache=refresh_cache).dashboard_aggregates()
+    if out_path is None:
+        buf = io.BytesIO()
+        render_static_dashboard(aggs, [buf], dpi=dpi, fmt=fmt)
+        return buf.getvalue()
+    render_static_dashboard(aggs, [out_path], dpi=dpi)
+    print(f"Saved static dashboard → {out_path}")
+
+def dashboard_aggregates(df: pd.DataFrame, orders=None) -> dict:
+    """Everything the static dashboard draws; small enough to ship to a render worker."""
+    return {
+        "kpis": kpis(df, orders=orders),
+        "ts": monthly_revenue(df),
+        "top5": top_products(df, n=5),
+        "reg": revenue_by_region(df),
+        "cat": category_share(df),
+        "pivot": monthly_pivot(df),
+    }
+
+def render_static_dashboard(aggs: dict, out_paths, dpi=300, title="Sales Data Dashboard — Portfolio Export", fmt=None):
+    """Draw the dashboard once and save it to every path or buffer (format from fmt or the suffix).
+
+    Uses a standalone Figure rather than pyplot, so concurrent renders in one process don't share state.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Circle
+    import seaborn as sns
+
+    KP, ts, top5, reg, cat, pivot = (aggs[k] for k in ("kpis", "ts", "top5", "reg", "cat", "pivot"))
+    # bound what gets drawn: the moving average uses the full series before it is thinned
+    ma = trailing_mean(ts, 3)
+    ts = downsample(ts)
+    ma = ma.loc[ts.index]
+    pivot, reg, cat = cap_rows(pivot), top_k(reg, PIE_SLICES), top_k(cat, PIE_SLICES)
+    for name, data in (("ts", ts), ("top5", top5), ("reg", reg), ("cat", cat), ("pivot", pivot)):
+        log_payload(name, data)
 
     sns.set_style("whitegrid")
-    fig = plt.figure(constrained_layout=True, figsize=(14,10))
+    fig = Figure(constrained_layout=True, figsize=(14,10))
     gs = fig.add_gridspec(3, 4)
 
     # KPI panel (full width top)
@@ -27,7 +70,6 @@ def create_static_dashboard(data_path: str, out_path="sales_dashboard_portfolio.
     # Time series
     ax_ts = fig.add_subplot(gs[1, :2])
     ax_ts.plot(ts.index, ts.values, marker='o', linewidth=2)
-    ma = ts.rolling(3, min_periods=1).mean()
     ax_ts.plot(ma.index, ma.values, linestyle='--', alpha=0.8)
     ax_ts.set_title("Monthly Revenue")
     ax_ts.tick_params(axis='x', rotation=45)
@@ -53,13 +95,19 @@ def create_static_dashboard(data_path: str, out_path="sales_dashboard_portfolio.
     # Category donut
     ax_cat = fig.add_subplot(gs[2, 3])
     wedges, texts, autotexts = ax_cat.pie(cat.values, labels=cat.index, autopct='%1.1f%%', startangle=140)
-    centre_circle = plt.Circle((0,0),0.70,fc='white')
+    centre_circle = Circle((0,0),0.70,fc='white')
     fig.gca().add_artist(centre_circle)
     ax_cat.set_title("Revenue by Category")
 
-    plt.suptitle("Sales Data Dashboard — Portfolio Export", fontsize=16, fontweight='bold', y=0.99)
-    fig.savefig(out_path, dpi=300)
-    print(f"Saved static dashboard → {out_path}")
+    fig.suptitle(title, fontsize=16, fontweight='bold', y=0.99)
+    for out_path in out_paths:
+        fig.savefig(out_path, dpi=dpi, format=fmt)
 
 if __name__ == "__main__":
-    create_static_dashboard("data/sample_sales_data.csv")
+    parser = argparse.ArgumentParser(description="Export the portfolio dashboard PNG.")
+    parser.add_argument("data_path", nargs="?", default="data/sample_sales_data.csv")
+    parser.add_argument("--out", default="sales_dashboard_portfolio.png")
+    parser.add_argument("--no-cache", action="store_true", help="parse the CSV directly, bypassing the prepared-data cache")
+    parser.add_argument("--rebuild-cache", action="store_true", help="re-parse the CSV and overwrite its cache entry")
+    args = parser.parse_args()
+    create_static_dashboard(args.data_path, out_path=args.out, use_cache=not args.no_cache, refresh_cache=args.rebuild_cache)
@@ -1,140 +1,230 @@
 # src/dashboard_streamlit.py
+import os
 import streamlit as st
 import pandas as pd
-import io
-from analytics import (
-    load_and_prepare,
-    kpis,
-    monthly_revenue,
-    top_products,
-    revenue_by_region,
-    category_share,
-    monthly_pivot,
-    top_products_by_region,
-    auto_insights,
-    percent_change
-)
-import plotly.express as px
-import plotly.graph_objects as go
-from dashboard_static import create_static_dashboard
-
-
-from pathlib import Path
-
-DATA_PATH = "data/sample_sales_data.csv"
+import time
+from contextlib import contextmanager
+from engine import get_engine
+from windows import PERIODS, trailing_mean
+from memo import MEMO, normalize_filters
+from chart_data import cap_rows, downsample, top_k, log_payload, PIE_SLICES
+
+DATA_PATH = os.environ.get("SALES_DATA_PATH", "data/sample_sales_data.csv")
 
 st.set_page_config(page_title="Sales Data Dashboard", layout="wide", initial_sidebar_state="expanded")
 st.title("📊 Sales Data Dashboard")
 
-# Load
-df = load_and_prepare(DATA_PATH)
+# The shared Engine (as used by the CLI, the API and the batch export) holds the prepared rows,
+# cube, sketches and filter index of the dataset; every section below asks it for results, which
+# are memoized per dataset version and filter state and so shared between sessions. It is kept per
+# path and follows appends to the file: a rerun folds in only the rows added since the last one.
+@st.cache_resource(max_entries=1)
+def load_engine(path):
+    return get_engine(path).warm()
+
+engine = load_engine(DATA_PATH)
+if not engine.refresh():  # truncated or replaced rather than appended to
+    load_engine.clear()
+    engine = load_engine(DATA_PATH)
+st.session_state['rendered_version'] = engine.version
 
 # Sidebar filters
 st.sidebar.header("Filters")
-years = sorted(df['Year'].unique(), reverse=True)
+years = sorted(engine.options('Year'), reverse=True)
 sel_year = st.sidebar.selectbox("Year", options=years, index=0)
-regions = ["All"] + sorted(df['Region'].unique())
+regions = ["All"] + engine.options('Region')
 sel_regions = st.sidebar.multiselect("Region (choose one or more)", options=regions, default=["All"])
-
-if "All" in sel_regions:
-    filtered = df[df['Year'] == sel_year]
-else:
-    filtered = df[(df['Year'] == sel_year) & (df['Region'].isin(sel_regions))]
-
-# KPIs
-KP = kpis(filtered)
-col1, col2, col3, col4 = st.columns(4)
-col1.metric("Total Revenue", f"${KP['total_revenue']:,.0f}")
-col2.metric("Total Orders", f"{KP['total_orders']}")
-col3.metric("Avg Order Value", f"${KP['avg_order_value']:,.2f}")
-col4.metric("Top Product", KP['top_product'])
-
-# Delta KPIs vs previous year (if present)
-prev = df[df['Year'] == (sel_year - 1)]
-if not prev.empty:
-    prev_kp = kpis(prev)
-    delta_revenue = percent_change(KP['total_revenue'], prev_kp['total_revenue'])
-    if delta_revenue is not None:
-        st.metric(label="Revenue Δ YoY", value=f"{delta_revenue:+.1f}%", delta=f"{delta_revenue:+.1f}%")
-
+compare_period = st.sidebar.selectbox("Compare revenue", options=list(PERIODS), index=list(PERIODS).index("YoY"),
+                                      format_func=lambda p: f"{p} — {PERIODS[p]}")
+exact_counts = st.sidebar.checkbox("Exact order/customer counts", value=False,
+                                   help="Always count distinct IDs from the raw rows; otherwise large selections "
+                                        "are estimated from the HyperLogLog sketches")
+
+live = st.sidebar.checkbox("Live tail", value=False, help="Check the CSV for appended rows on a timer and rerun the dashboard when there are some")
+live_interval = st.sidebar.slider("Live refresh (seconds)", 1, 60, 5) if live else None
+debug = st.sidebar.checkbox("Show debug panel", value=False, help="Analytics cache counters and per-section render timings")
+
+filters = {'Year': sel_year, 'Region': sel_regions}
+
+# Every section below is a fragment: its own widgets rerun only that section, and the sidebar
+# filters (a full rerun) are the only input shared by all of them.
+@contextmanager
+def timed(section):
+    t0 = time.perf_counter()
+    yield
+    ms = (time.perf_counter() - t0) * 1000
+    st.session_state.setdefault('section_ms', {})[section] = ms
+    if debug:
+        st.caption(f"⏱ {section}: {ms:,.1f} ms")
+
+@st.fragment
+def kpi_section(filters, exact_counts, period):
+    with timed("KPIs"):
+        # unticked, the engine's policy decides between exact and sketched distinct counts
+        KP = engine.kpis(filters, exact=exact_counts or None)
+        col1, col2, col3, col4, col5 = st.columns(5)
+        col1.metric("Total Revenue", f"${KP['total_revenue']:,.0f}")
+        col2.metric("Total Orders", f"{KP['total_orders']}")
+        col3.metric("Avg Order Value", f"${KP['avg_order_value']:,.2f}")
+        col4.metric("Unique Customers", f"{KP['unique_customers']}")
+        col5.metric("Top Product", KP['top_product'])
+
+        # Revenue vs the comparison period, ending at the selected year's last month with data;
+        # answered from prefix sums, so no extra scan of the cube or the rows
+        anchor = min(engine.windows.last, filters['Year'] * 12 + 11)
+        cmp = engine.windows.compare(period, anchor, filters)
+        delta = f"{cmp['change_pct']:+.1f}%" if cmp['change_pct'] is not None else None
+        st.metric(label=f"Revenue Δ {period}", value=f"${cmp['current']:,.0f}", delta=delta,
+                  help=f"{' – '.join(cmp['current_range'])} vs {' – '.join(cmp['previous_range'])}"
+                       + ("" if delta else " (no revenue in the comparison period)"))
+
+@st.fragment
+def insights_section():
+    with timed("Insights"):
+        ins = engine.auto_insights()
+        if ins:
+            st.markdown("### 🔎 Automated Insights")
+            for i in ins:
+                st.markdown(f"- {i}")
+            st.markdown("---")
+
+@st.fragment
+def time_series_section(filters):
+    # plotly (and matplotlib, for the PNG export) are imported where they are drawn, so a session
+    # doesn't load a plotting stack it never reaches; after the first import these are dict lookups
+    import plotly.express as px
+    import plotly.graph_objects as go
+    with timed("Monthly revenue"):
+        st.subheader("Monthly Revenue")
+        ts = engine.monthly_revenue(filters)
+        if ts.empty:
+            st.write("No data for selected filters.")
+        else:
+            # moving average over the full series, then both lines thinned to the same points
+            ma = trailing_mean(ts, 3, min_periods=3)
+            ts = downsample(ts)
+            fig = px.line(x=ts.index, y=ts.values, labels={'x':'Month','y':'Revenue'}, markers=True)
+            fig.add_trace(go.Scatter(x=ts.index, y=ma.loc[ts.index], mode='lines', name='3-month MA', line=dict(dash='dash')))
+            fig.update_layout(hovermode="x unified")
+            log_payload("monthly_revenue", fig)
+            st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+def heatmap_section(filters):
+    import plotly.express as px
+    with timed("Heatmap"):
+        st.subheader("Product vs Month Heatmap")
+        pivot = engine.monthly_pivot(filters)
+        if not pivot.empty:
+            fig2 = px.imshow(cap_rows(pivot.fillna(0)), labels=dict(x="Month", y="Product", color="Revenue"), aspect="auto")
+            log_payload("heatmap", fig2)
+            st.plotly_chart(fig2, use_container_width=True)
+
+@st.fragment
+def top_products_section(filters):
+    import plotly.express as px
+    with timed("Top products"):
+        st.subheader("Top Products")
+        tp = engine.top_products(filters, n=10).reset_index()
+        if tp.empty:
+            st.write("No data")
+        else:
+            fig3 = px.bar(tp, x='Revenue', y='Product', orientation='h', text='Revenue', color='Revenue', color_continuous_scale='Blues')
+            fig3.update_traces(texttemplate='$%{text:.0f}', textposition='outside')
+            fig3.update_layout(yaxis={'categoryorder':'total ascending'}, margin=dict(l=0))
+            log_payload("top_products", fig3)
+            st.plotly_chart(fig3, use_container_width=True)
+
+@st.fragment
+def region_section(filters):
+    import plotly.express as px
+    with timed("Revenue by region"):
+        st.subheader("Revenue by Region")
+        reg = top_k(engine.revenue_by_region(filters), PIE_SLICES).reset_index()
+        if not reg.empty:
+            fig4 = px.pie(reg, names='Region', values='Revenue', hole=0.45)
+            log_payload("revenue_by_region", fig4)
+            st.plotly_chart(fig4, use_container_width=True)
+
+@st.fragment
+def top_by_region_section(filters):
+    # changing the region here reruns this section only
+    with timed("Top products by region"):
+        st.subheader("Top Products by Region")
+        regions = list(engine.revenue_by_region(filters).index)
+        sel_region_for_top = st.selectbox("Choose region", options=regions)
+        if sel_region_for_top:
+            tpr = engine.top_products_by_region(sel_region_for_top, filters, n=5)
+            if not tpr.empty:
+                st.table(tpr.reset_index().rename(columns={'Revenue':'Revenue ($)'}))
+
+@st.fragment
+def csv_export_section(filters):
+    # the CSV is only serialised when asked for; the download button then serves those bytes
+    with timed("CSV export"):
+        if st.button("Prepare filtered data (CSV)"):
+            csv = engine.filtered(filters).to_csv(index=False).encode('utf-8')
+            st.download_button("Download filtered data (CSV)", data=csv, file_name="filtered_sales.csv", mime="text/csv")
+
+@st.fragment
+def png_export_section(filters):
+    # rendered in memory from the engine's aggregates and cached per filter state, so identical
+    # exports are shared between users and nothing is written to disk
+    with timed("PNG export"):
+        if st.button("Generate PNG (high-res)"):
+            try:
+                from dashboard_static import create_static_dashboard
+                png = MEMO.get_or_compute(('png', normalize_filters(filters)), engine.path, engine.version,
+                                          lambda: create_static_dashboard(engine.dashboard_aggregates(filters), out_path=None))
+                st.download_button("Download generated PNG", data=png, file_name="sales_dashboard.png", mime="image/png")
+            except Exception as e:
+                st.error(f"Export failed: {e}")
+
+# Runs on its own timer: folds appended rows into the shared engine and, when this session hasn't
+# shown them yet (another session may have folded them in), reruns the whole app so every section does
+def live_section():
+    if not engine.refresh():
+        load_engine.clear()
+        st.rerun(scope="app")
+    if engine.version != st.session_state.get('rendered_version'):
+        st.rerun(scope="app")
+    with timed("Live"):
+        rows = engine.count()
+        shown = st.session_state.get('live_rows', rows)
+        st.session_state['live_rows'] = rows
+        st.caption(f"🔴 Live: {rows:,} rows (+{rows - shown:,} since the last update), checked at {time.strftime('%H:%M:%S')}")
+
+kpi_section(filters, exact_counts, compare_period)
+if live:
+    st.fragment(run_every=live_interval)(live_section)()
 st.markdown("---")
-
-# Auto Insights
-ins = auto_insights(df)
-if ins:
-    st.markdown("### 🔎 Automated Insights")
-    for i in ins:
-        st.markdown(f"- {i}")
-    st.markdown("---")
+insights_section()
 
 # Charts layout
 left, right = st.columns((2,1))
-
-# Time series (left)
 with left:
-    st.subheader("Monthly Revenue")
-    ts = monthly_revenue(filtered)
-    if ts.empty:
-        st.write("No data for selected filters.")
-    else:
-        fig = px.line(x=ts.index, y=ts.values, labels={'x':'Month','y':'Revenue'}, markers=True)
-        fig.add_trace(go.Scatter(x=ts.index, y=ts.rolling(3).mean(), mode='lines', name='3-month MA', line=dict(dash='dash')))
-        fig.update_layout(hovermode="x unified")
-        st.plotly_chart(fig, use_container_width=True)
-
-    # Heatmap product x month
-    st.subheader("Product vs Month Heatmap")
-    pivot = monthly_pivot(filtered)
-    if not pivot.empty:
-        fig2 = px.imshow(pivot.fillna(0), labels=dict(x="Month", y="Product", color="Revenue"), aspect="auto")
-        st.plotly_chart(fig2, use_container_width=True)
-
-# Right column charts
+    time_series_section(filters)
+    heatmap_section(filters)
 with right:
-    st.subheader("Top Products")
-    tp = top_products(filtered, n=10).reset_index()
-    if tp.empty:
-        st.write("No data")
-    else:
-        fig3 = px.bar(tp, x='Revenue', y='Product', orientation='h', text='Revenue', color='Revenue', color_continuous_scale='Blues')
-        fig3.update_traces(texttemplate='$%{text:.0f}', textposition='outside')
-        fig3.update_layout(yaxis={'categoryorder':'total ascending'}, margin=dict(l=0))
-        st.plotly_chart(fig3, use_container_width=True)
-
-    st.subheader("Revenue by Region")
-    reg = revenue_by_region(filtered).reset_index()
-    if not reg.empty:
-        fig4 = px.pie(reg, names='Region', values='Revenue', hole=0.45)
-        st.plotly_chart(fig4, use_container_width=True)
-
-# Top products by selected region (extra)
-st.subheader("Top Products by Region")
-sel_region_for_top = st.selectbox("Choose region", options=list(filtered['Region'].unique()))
-if sel_region_for_top:
-    tpr = top_products_by_region(filtered, sel_region_for_top, n=5)
-    if not tpr.empty:
-        st.table(tpr.reset_index().rename(columns={'Revenue':'Revenue ($)'}))
+    top_products_section(filters)
+    region_section(filters)
+
+top_by_region_section(filters)
 
 st.markdown("---")
-# Downloads
 st.subheader("Export & Download")
-
-# Download filtered data CSV
-csv = filtered.to_csv(index=False).encode('utf-8')
-st.download_button("Download filtered data (CSV)", data=csv, file_name="filtered_sales.csv", mime="text/csv")
-
-# Create static PNG for current filtered dataset (calls static generator)
-if st.button("Generate PNG (high-res)"):
-    tmp_out = "sales_dashboard.png"
-    # Save filtered dataset temporarily
-    tmp_path = "data/tmp_filtered.csv"
-    filtered.to_csv(tmp_path, index=False)
-    # Use static generator with that file
-    try:
-        create_static_dashboard(tmp_path, out_path=tmp_out)
-        with open(tmp_out, "rb") as f:
-            st.download_button("Download generated PNG", data=f, file_name=tmp_out, mime="image/png")
-    except Exception as e:
-        st.error(f"Export failed: {e}")
-
+csv_export_section(filters)
+png_export_section(filters)
 st.caption("Tip: Use the filters, then click 'Generate PNG' to export a snapshot of the current view.")
+
+# Debug: shared analytics cache counters and section timings (fragments rerun on their own, so
+# their captions carry the latest timing; this table is as of the last full run)
+if debug:
+    stats = MEMO.stats()
+    st.sidebar.metric("Cache hit rate", f"{stats['hit_rate']:.0%}")
+    st.sidebar.json(stats)
+    st.sidebar.caption("Section render timings (ms)")
+    st.sidebar.dataframe(pd.DataFrame([{"section": k, "ms": v} for k, v in st.session_state.get('section_ms', {}).items()]), hide_index=True)
+    st.sidebar.caption("Insight timings (ms, as computed for this dataset version)")
+    st.sidebar.dataframe(pd.DataFrame([{"insight": i['name'], "ms": i['seconds'] * 1000}
+                                       for i in engine.insights()]), hide_index=True)
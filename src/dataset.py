@@ -0,0 +1,159 @@
+# src/dataset.py
+# Out-of-core sales dataset: a directory of Year/Month-partitioned files.
+#
+# Layout is hive-style, root/Year=2025/Month=03/<name>.csv|.parquet, with a _manifest.json next to
+# it recording rows and regions per file. Scans use the partition path (Year/Month) and the manifest
+# (Region) to skip files that cannot match the filters, then stream the survivors in chunks and fold
+# them into a cube and distinct-count sketches, so memory is bounded by the chunk size plus the
+# aggregates. The results feed the usual analytics functions (kpis, monthly_revenue, top_products...).
+#
+# Run: python src/dataset.py partition data/sales_history.csv data/partitioned
+#      python src/dataset.py summary data/partitioned --year 2025 --region North East
+import json
+import os
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from analytics import DEFAULT_CHUNKSIZE, iter_chunks, prepare_chunk, kpis, monthly_revenue, top_products, revenue_by_region
+from cube import build_cube, merge_cubes, apply_filters, filter_values
+from sketches import SketchTable
+
+MANIFEST = "_manifest.json"
+_PART = re.compile(r"^(Year|Month)=(\d+)$")
+
+def _partition_of(path: Path, root: Path) -> dict:
+    keys = {}
+    for part in path.relative_to(root).parts[:-1]:
+        m = _PART.match(part)
+        if m:
+            keys[m.group(1)] = int(m.group(2))
+    return keys
+
+def partition_csv(src, root, chunksize: int = DEFAULT_CHUNKSIZE, name: str = None) -> "PartitionedDataset":
+    """Split a (possibly larger than memory) CSV into Year/Month partitions, one chunk at a time.
+
+    Partitions are written to temporary files and moved into place at the end, replacing the files a
+    previous run wrote under the same name, so partitioning the same source again doesn't duplicate rows.
+    """
+    root, name = Path(root), name or Path(src).stem
+    written = {}  # partition file -> (temporary file being appended to, manifest entry)
+    for chunk in iter_chunks(src, chunksize):
+        for (year, month), part in chunk.groupby([chunk['Date'].dt.year, chunk['Date'].dt.month], sort=False):
+            path = root / f"Year={year}" / f"Month={month:02d}" / f"{name}.csv"
+            new = path not in written
+            if new:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                written[path] = (path.with_name(f".{name}.csv.tmp"), {"rows": 0, "regions": []})
+            tmp, entry = written[path]
+            part.drop(columns=['Year', 'Month']).to_csv(tmp, mode="w" if new else "a", header=new, index=False,
+                                                        date_format="%Y-%m-%d")
+            entry["rows"] += len(part)
+            entry["regions"] = sorted(set(entry["regions"]) | set(part['Region'].dropna().astype(str)))
+    manifest = _read_manifest(root)
+    for old in root.glob(f"Year=*/Month=*/{name}.csv"):
+        if old not in written:
+            old.unlink()
+        manifest.pop(str(old.relative_to(root)), None)
+    for path, (tmp, entry) in written.items():
+        os.replace(tmp, path)
+        manifest[str(path.relative_to(root))] = entry
+    (root / MANIFEST).write_text(json.dumps(manifest, indent=1))
+    return PartitionedDataset(root)
+
+def _read_manifest(root: Path) -> dict:
+    try:
+        return json.loads((root / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return {}
+
+class PartitionedDataset:
+    def __init__(self, root):
+        self.root = Path(root)
+        manifest = _read_manifest(self.root)
+        self.files = []
+        for path in sorted(list(self.root.rglob("*.csv")) + list(self.root.rglob("*.parquet"))):
+            meta = manifest.get(str(path.relative_to(self.root)), {})
+            self.files.append({"path": path, **_partition_of(path, self.root),
+                               "regions": set(meta["regions"]) if "regions" in meta else None,
+                               "rows": meta.get("rows")})
+
+    def prune(self, filters: dict = None) -> list:
+        """Files that can contain rows matching filters (Year/Month from the path, Region from the manifest)."""
+        filters = filters or {}
+        keep = []
+        for f in self.files:
+            ok = True
+            for col in ('Year', 'Month'):
+                values = filter_values(filters.get(col))
+                if values is not None and col in f and f[col] not in {int(v) for v in values}:
+                    ok = False
+            regions = filter_values(filters.get('Region'))
+            if ok and regions is not None and f["regions"] is not None and not f["regions"] & {str(r) for r in regions}:
+                ok = False
+            if ok:
+                keep.append(f["path"])
+        return keep
+
+    def scan(self, filters: dict = None, chunksize: int = DEFAULT_CHUNKSIZE):
+        """Prepared, filtered chunks from the files that survive pruning."""
+        for path in self.prune(filters):
+            if path.suffix == ".parquet":
+                import pyarrow.parquet as pq
+                chunks = (prepare_chunk(b.to_pandas()) for b in pq.ParquetFile(path).iter_batches(batch_size=chunksize))
+            else:
+                chunks = iter_chunks(path, chunksize)
+            for chunk in chunks:
+                chunk = apply_filters(chunk, filters)
+                if not chunk.empty:
+                    yield chunk
+
+    def aggregate(self, filters: dict = None, chunksize: int = DEFAULT_CHUNKSIZE):
+        """(cube, sketches) over the matching rows, built by streaming the surviving partitions."""
+        cube, sketches = None, {}
+        for chunk in self.scan(filters, chunksize):
+            cube = merge_cubes(cube, build_cube(chunk))
+            for col in ('OrderID', 'CustomerID'):
+                if col in chunk.columns:
+                    s = SketchTable.build(chunk, col)
+                    sketches[col] = sketches[col].merge(s) if col in sketches else s
+        return (cube if cube is not None else merge_cubes()), sketches
+
+    def summary(self, filters: dict = None, n: int = 10, chunksize: int = DEFAULT_CHUNKSIZE) -> dict:
+        cube, sketches = self.aggregate(filters, chunksize)
+        if cube.empty:
+            return {"kpis": None, "monthly_revenue": pd.Series(dtype=float), "revenue_by_region": pd.Series(dtype=float),
+                    "top_products": pd.Series(dtype=float)}
+        counts = {col: s.count() for col, s in sketches.items()}
+        return {
+            "kpis": kpis(cube, orders=counts.get('OrderID'), customers=counts.get('CustomerID')),
+            "monthly_revenue": monthly_revenue(cube),
+            "revenue_by_region": revenue_by_region(cube),
+            "top_products": top_products(cube, n=n),
+        }
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Partition and query an out-of-core sales dataset.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("partition", help="split a CSV into Year/Month partitions")
+    p.add_argument("src")
+    p.add_argument("root")
+    p.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    q = sub.add_parser("summary", help="KPIs and top products for a filter, streaming only matching partitions")
+    q.add_argument("root")
+    q.add_argument("--year", type=int, nargs="*")
+    q.add_argument("--region", nargs="*")
+    q.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+    if args.cmd == "partition":
+        ds = partition_csv(args.src, args.root, args.chunksize)
+        print(f"Wrote {len(ds.files)} partition files under {ds.root}")
+    else:
+        ds = PartitionedDataset(args.root)
+        filters = {'Year': args.year, 'Region': args.region}
+        print(f"Scanning {len(ds.prune(filters))} of {len(ds.files)} partition files")
+        result = ds.summary(filters, chunksize=args.chunksize)
+        print(result["kpis"])
+        print(result["top_products"].to_string())
@@ -0,0 +1,356 @@
+# src/engine.py
+# Shared analytics engine behind every entry point.
+#
+# An Engine owns one prepared copy of a dataset (load_and_prepare through the columnar cache), the
+# derived structures built from it (cube, distinct-count sketches, filter index) and an execution
+# backend for work that needs the rows. The additive functions (revenue by month, product, region
+# and category, the pivot, top-k, insights) are answered from the cube cells matching the filters;
+# the rows are only visited for exact distinct counts and for filters on columns the cube doesn't
+# keep. Results are memoized in the process-wide MemoCache by source, function, arguments and
+# normalized filters, so the CLI, the static export, the Streamlit apps and the HTTP API compute the
+# same numbers the same way.
+#
+# Backends: "pandas" (group-bys on the prepared frame), "parallel" (shared-memory partition
+# aggregation, see parallel.py) and "compact" (dictionary-encoded CompactTable, see compact.py).
+#
+# An engine over a CSV that is being appended to can follow it (Engine.refresh): only the appended bytes
+# are read and prepared. Each batch is kept as a segment next to the loaded rows, with its own cube cells,
+# and merged into the sketches in place; queries read the loaded rows and the segments together. Once the
+# segments hold COMPACT_FRACTION of the loaded rows they are compacted into the frame, cube and filter
+# index in one go, so a refresh costs what it appends rather than what the file holds.
+#
+# Distinct counts follow one policy for every caller (Engine.exact_counts): selections of up to
+# EXACT_DISTINCT_ROWS rows are counted exactly from the rows, larger ones are estimated from the
+# HyperLogLog sketches when those cover the filters. Callers can force exact counts.
+import os
+import threading
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from analytics import (load_and_prepare, complete_lines, prepare_frame, concat_frames, kpis, nunique, monthly_revenue, top_products,
+                       revenue_by_region, category_share, monthly_pivot, top_products_by_region)
+from cache import load_cached, fingerprint
+from compact import CompactTable
+from cube import build_cube, merge_cubes, apply_filters, filter_values
+from filter_index import FilterIndex
+from insights import insights_report
+from live_tail import CsvTail
+from memo import MEMO, normalize_filters
+from sketches import SketchTable
+from windows import WindowEngine
+
+EXACT_DISTINCT_ROWS = int(os.environ.get("SALES_EXACT_DISTINCT_ROWS", 1_000_000))
+DISTINCT_COLUMNS = {'orders': 'OrderID', 'customers': 'CustomerID'}  # kpis() argument -> column
+INSIGHT_COLUMNS = ['Month', 'Product', 'Region', 'Revenue']
+COMPACT_FRACTION = float(os.environ.get("SALES_COMPACT_FRACTION", 0.1))  # appended rows / loaded rows
+COMPACT_MIN_ROWS = 10_000
+
+class PandasBackend:
+    name = "pandas"
+
+    def prepare(self, df):
+        return df
+
+    def run(self, fn, data, rows, *args, **kwargs):
+        return fn(data, *args, rows=rows, **kwargs)
+
+class ParallelBackend(PandasBackend):
+    name = "parallel"
+
+    def __init__(self, workers: int = None):
+        self.workers = workers or os.cpu_count() or 1
+
+    def run(self, fn, data, rows, *args, **kwargs):
+        return fn(data, *args, rows=rows, workers=self.workers, **kwargs)
+
+class CompactBackend(PandasBackend):
+    name = "compact"
+
+    def prepare(self, df):
+        return CompactTable.from_frame(df)
+
+BACKENDS = {b.name: b for b in (PandasBackend, ParallelBackend, CompactBackend)}
+
+class Engine:
+    def __init__(self, path, backend: str = "pandas", version: str = None, use_cache: bool = True,
+                 refresh_cache: bool = False, **backend_options):
+        self.path = str(path)
+        self.version = version or fingerprint(path)
+        # rows are loaded up to the last line break, and refresh() continues from exactly there: a line
+        # still being written is left for it, and bytes appended during the load aren't read twice
+        self.loaded_bytes = complete_lines(path)
+        self._df = load_cached(path, load_and_prepare, enabled=use_cache, refresh=refresh_cache, nbytes=self.loaded_bytes)
+        self.backend = BACKENDS[backend](**backend_options)
+        self.lock = threading.RLock()  # held while appended rows are folded in, and by readers of the rows
+        self._csv_tail = None
+        self._segments = []  # (prepared batch, its cube cells) appended since the last compaction
+        self._appended = None  # the segments concatenated, built on first use after an append
+
+    @property
+    def df(self):
+        """All prepared rows, with appended segments compacted in."""
+        with self.lock:
+            self.compact()
+            return self._df
+
+    @cached_property
+    def data(self):
+        """The loaded rows in the backend's representation."""
+        return self.backend.prepare(self._df)
+
+    @cached_property
+    def _cube(self):
+        return build_cube(self._df)
+
+    @property
+    def cube(self):
+        """Cube cells of all rows, appended segments included."""
+        with self.lock:
+            return merge_cubes(self._cube, self.appended()[1]) if self._segments else self._cube
+
+    @cached_property
+    def sketches(self) -> dict:
+        with self.lock:
+            tables = {col: SketchTable.build(self._df, col) for col in DISTINCT_COLUMNS.values() if col in self._df.columns}
+            for batch, _ in self._segments:
+                for col, sketch in tables.items():
+                    sketch.merge(SketchTable.build(batch, col))
+            return tables
+
+    @cached_property
+    def index(self) -> FilterIndex:
+        """Filter index over the loaded rows (segments are scanned until compacted)."""
+        return FilterIndex(self._df)
+
+    @cached_property
+    def windows(self) -> WindowEngine:
+        """Prefix sums for period comparisons, built from the cube."""
+        return WindowEngine.from_frame(self.cells())
+
+    def warm(self) -> "Engine":
+        """Build the derived structures now rather than on first use (e.g. before swapping a reloaded engine in)."""
+        self._cube, self.sketches, self.index, self.windows
+        return self
+
+    def append(self, raw):
+        """Fold raw rows of the source file into the engine with load_and_prepare's rules; returns the prepared batch.
+
+        The batch becomes a segment with its own cube cells and is merged into the sketches in place, as in
+        IncrementalAggregates; the windows are rebuilt on next use. Segments are compacted into the frame,
+        cube and filter index once they hold COMPACT_FRACTION of the loaded rows.
+        """
+        batch = prepare_frame(raw.copy())
+        if batch.empty:
+            return batch
+        with self.lock:
+            self._segments.append((batch, build_cube(batch)))
+            self._appended = None
+            for col, sketch in self.__dict__.get('sketches', {}).items():
+                sketch.merge(SketchTable.build(batch, col))
+            self.__dict__.pop('windows', None)
+            if self.appended_rows >= max(COMPACT_FRACTION * len(self._df), COMPACT_MIN_ROWS):
+                self.compact()
+        return batch
+
+    @property
+    def appended_rows(self) -> int:
+        return sum(len(batch) for batch, _ in self._segments)
+
+    def appended(self):
+        """(rows, cube cells) of the segments appended since the last compaction, each as one frame."""
+        with self.lock:
+            if self._appended is None:
+                batches, cubes = zip(*self._segments)
+                self._appended = (concat_frames(list(batches), ignore_index=True), merge_cubes(*cubes))
+            return self._appended
+
+    def compact(self):
+        """Merge the appended segments into the loaded frame, its cube and filter index."""
+        with self.lock:
+            if not self._segments:
+                return
+            rows, cells = self.appended()
+            derived = self.__dict__
+            self._df = concat_frames([self._df, rows], ignore_index=True)
+            if '_cube' in derived:
+                self._cube = merge_cubes(self._cube, cells)
+            if 'index' in derived and not self.index.append(rows):
+                del self.index
+            derived.pop('data', None)
+            self._segments, self._appended = [], None
+
+    def refresh(self) -> bool:
+        """Fold in rows appended to the source file since it was loaded or last refreshed.
+
+        Returns False if the file was truncated or replaced instead; the engine then no longer describes
+        it and has to be reloaded.
+        """
+        with self.lock:
+            if self._csv_tail is None:
+                self._csv_tail = CsvTail(self.path).resume(self.loaded_bytes)
+                self._base_version = self.version
+            added = 0
+            while True:
+                raw, reset = self._csv_tail.read_new()
+                if reset:
+                    return False
+                if raw.empty:
+                    break
+                added += len(self.append(raw))
+            if added:
+                self.version = f"{self._base_version}+{self._csv_tail.offset}"
+            return True
+
+    def rows(self, filters: dict = None):
+        """Row positions matching filters (None for all rows), counting the loaded rows first and then the
+        appended segments; columns outside the filter index, and the segments, are scanned."""
+        active = {col: filter_values(value) for col, value in (filters or {}).items() if filter_values(value) is not None}
+        indexed, scanned = {}, {}
+        for col, values in active.items():
+            (indexed if col in self.index.values else scanned)[col] = values
+        rows = self.index.select(indexed)
+        if scanned:
+            sub = FilterIndex.take(self._df, rows, list(scanned))
+            keep = np.ones(len(sub), dtype=bool)
+            for col, values in scanned.items():
+                keep &= sub[col].isin(values).to_numpy()
+            rows = (np.arange(len(self._df)) if rows is None else rows)[keep]
+        if not active or not self._segments:
+            return rows
+        appended = self.appended()[0]
+        keep = np.ones(len(appended), dtype=bool)
+        for col, values in active.items():
+            keep &= appended[col].isin(values).to_numpy()
+        return np.concatenate([rows, len(self._df) + np.flatnonzero(keep)])
+
+    def take(self, rows, columns=None):
+        """Rows at positions from rows() (None for all), across the loaded rows and the appended segments."""
+        if not self._segments:
+            return FilterIndex.take(self._df, rows, columns)
+        appended, n = self.appended()[0], len(self._df)
+        if rows is None:
+            parts = [FilterIndex.take(self._df, None, columns), FilterIndex.take(appended, None, columns)]
+        else:
+            split = np.searchsorted(rows, n)
+            parts = [FilterIndex.take(self._df, rows[:split], columns), FilterIndex.take(appended, rows[split:] - n, columns)]
+        return pd.concat(parts, ignore_index=True)
+
+    def cells(self, filters: dict = None):
+        """Cube cells matching filters; appended segments contribute their own cells next to the loaded ones."""
+        cells = apply_filters(self._cube, filters)
+        if self._segments:
+            cells = pd.concat([cells, apply_filters(self.appended()[1], filters)], ignore_index=True)
+        return cells
+
+    def count(self, filters: dict = None) -> int:
+        with self.lock:
+            rows = self.rows(filters)
+            return len(self._df) + self.appended_rows if rows is None else len(rows)
+
+    def filtered(self, filters: dict = None):
+        with self.lock:
+            return self.take(self.rows(filters))
+
+    def options(self, column) -> list:
+        """Sorted distinct values of a column, e.g. for a filter widget."""
+        with self.lock:
+            if column in self.index.values:
+                values = list(self.index.values[column])
+            else:
+                values = sorted(self._df[column].dropna().unique())
+            if self._segments:
+                new = set(self.appended()[0][column].dropna().unique()).difference(values)
+                if new:
+                    values = sorted(new.union(values))
+            return values
+
+    def exact_counts(self, filters: dict = None, exact: bool = None) -> bool:
+        """Whether distinct counts for a selection come from the rows (True) or the sketches (False).
+
+        exact=True always counts exactly and exact=False uses the sketches wherever they cover the filters;
+        the default (None) counts exactly up to EXACT_DISTINCT_ROWS matching rows.
+        """
+        if exact or (exact is None and self.count(filters) <= EXACT_DISTINCT_ROWS):
+            return True
+        return not all(sketch.covers(filters) for sketch in self.sketches.values())
+
+    def on_cube(self, filters: dict = None) -> bool:
+        """Whether every column the filters restrict is a cube dimension, so cells can answer the selection."""
+        return all(col in self._cube.columns for col, value in (filters or {}).items() if filter_values(value) is not None)
+
+    def _run(self, fn, filters, *args, rows_only: bool = False, **kwargs):
+        # fn over the matching cube cells, or through the backend over the matching rows
+        cells = not rows_only and self.on_cube(filters)
+        key = ('engine', 'cube' if cells else self.backend.name, fn.__qualname__, normalize_filters(filters), args,
+               tuple(sorted(kwargs.items())))
+
+        def compute():
+            with self.lock:
+                if cells:
+                    return fn(self.cells(filters), *args, **kwargs)
+                if self._segments:  # the backend's data covers the loaded rows only until the next compaction
+                    return fn(self.take(self.rows(filters)), *args, **kwargs)
+                return self.backend.run(fn, self.data, self.rows(filters), *args, **kwargs)
+        return MEMO.get_or_compute(key, self.path, self.version, compute)
+
+    def kpis(self, filters: dict = None, exact: bool = None) -> dict:
+        """KPIs of a selection, with distinct counts as decided by exact_counts()."""
+        with self.lock:
+            if self.exact_counts(filters, exact):
+                counts = {arg: self._run(nunique, filters, col, rows_only=True)
+                          for arg, col in DISTINCT_COLUMNS.items() if col in self._df.columns}
+            else:
+                counts = {arg: self.sketches[col].count(filters) for arg, col in DISTINCT_COLUMNS.items() if col in self.sketches}
+            return self._run(kpis, filters, **counts)
+
+    def monthly_revenue(self, filters: dict = None):
+        return self._run(monthly_revenue, filters)
+
+    def top_products(self, filters: dict = None, n: int = 10):
+        return self._run(top_products, filters, n=n)
+
+    def revenue_by_region(self, filters: dict = None):
+        return self._run(revenue_by_region, filters)
+
+    def category_share(self, filters: dict = None):
+        return self._run(category_share, filters)
+
+    def monthly_pivot(self, filters: dict = None):
+        return self._run(monthly_pivot, filters)
+
+    def top_products_by_region(self, region, filters: dict = None, n: int = 5):
+        return self._run(top_products_by_region, filters, region, n=n)
+
+    def insights(self, filters: dict = None) -> list:
+        """Insights report of a selection: [{name, text, seconds}] (see insights.insights_report)."""
+        key = ('engine', 'insights', normalize_filters(filters))
+        def compute():
+            with self.lock:
+                if self.on_cube(filters):
+                    return insights_report(self.cells(filters)[INSIGHT_COLUMNS])
+                return insights_report(self.take(self.rows(filters), INSIGHT_COLUMNS))
+        return MEMO.get_or_compute(key, self.path, self.version, compute)
+
+    def auto_insights(self, filters: dict = None) -> list:
+        return [i['text'] for i in self.insights(filters) if i['text']]
+
+    def dashboard_aggregates(self, filters: dict = None) -> dict:
+        """Inputs of the static dashboard (same keys as dashboard_static.dashboard_aggregates)."""
+        return {"kpis": self.kpis(filters), "ts": self.monthly_revenue(filters), "top5": self.top_products(filters, n=5),
+                "reg": self.revenue_by_region(filters), "cat": self.category_share(filters),
+                "pivot": self.monthly_pivot(filters)}
+
+_ENGINES = {}
+_LOCK = threading.Lock()
+
+def get_engine(path, backend: str = "pandas", **options) -> Engine:
+    """Process-wide Engine for (path, backend), rebuilt when the file's content changes."""
+    version = fingerprint(path)
+    key = (str(path), backend, tuple(sorted(options.items())))
+    with _LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None or engine.version != version:
+            engine = _ENGINES[key] = Engine(path, backend, version=version, **options)
+        return engine
@@ -0,0 +1,103 @@
+# src/filter_index.py
+# Filter index for the dashboard sidebars.
+#
+# Built once at load time: for every indexed column the row positions are stored sorted by value
+# (sorted-partition offsets), next to a compact per-row code array. A selection starts from the
+# partitions of the most selective filter and checks the remaining filters only on those candidate
+# rows, so its cost follows the size of the result rather than the size of the table, and the
+# result is an array of row positions instead of a copied frame.
+import numpy as np
+import pandas as pd
+
+from cube import filter_values
+
+INDEX_COLUMNS = ['Year', 'Region', 'Product', 'Category', 'Salesperson']
+
+class FilterIndex:
+    def __init__(self, df: pd.DataFrame, columns=INDEX_COLUMNS):
+        self.n = len(df)
+        self.values, self.codes, self.order, self.offsets = {}, {}, {}, {}
+        pos_dtype = np.int32 if self.n < 2**31 else np.int64
+        for col in columns:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col], sort=True)
+            codes = codes + 1  # 0 is reserved for missing values
+            self.values[col] = {v: i + 1 for i, v in enumerate(uniques)}
+            self.codes[col] = codes.astype(np.min_scalar_type(len(uniques) + 1))
+            self.order[col] = np.argsort(codes, kind='stable').astype(pos_dtype)
+            self.offsets[col] = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(uniques) + 1))])
+
+    def append(self, df: pd.DataFrame) -> bool:
+        """Index rows added after the indexed ones; returns False, leaving the index as it was, if they bring
+        values the index hasn't seen (codes are assigned in sorted order, so those need a rebuild).
+
+        The new rows come after every indexed position, so each goes at the end of its value's partition
+        and the order grows by an insert rather than a re-sort.
+        """
+        if self.order and self.n + len(df) >= 2**31 > self.n:
+            return False  # positions no longer fit the int32 order arrays
+        new_codes = {}
+        for col, lookup in self.values.items():
+            values = df[col].astype(object)
+            codes = values.map(lookup)
+            if (codes.isna() & values.notna()).any():
+                return False
+            new_codes[col] = codes.fillna(0).to_numpy().astype(self.codes[col].dtype)
+        for col, codes in new_codes.items():
+            positions = np.arange(self.n, self.n + len(df), dtype=self.order[col].dtype)
+            counts = np.bincount(codes, minlength=len(self.offsets[col]) - 1)
+            self.order[col] = np.insert(self.order[col], np.repeat(self.offsets[col][1:], counts),
+                                        positions[np.argsort(codes, kind='stable')])
+            self.offsets[col] = self.offsets[col] + np.concatenate([[0], np.cumsum(counts)])
+            self.codes[col] = np.concatenate([self.codes[col], codes])
+        self.n += len(df)
+        return True
+
+    def _selected_codes(self, col, values):
+        if col not in self.values:
+            raise KeyError(f"column {col!r} is not indexed")
+        lookup = self.values[col]
+        return np.array(sorted({lookup[v] for v in values if v in lookup}), dtype=np.int64)
+
+    def select(self, filters: dict = None):
+        """Row positions (ascending) matching {column: value or list of values}, or None for all rows."""
+        active = []
+        for col, value in (filters or {}).items():
+            values = filter_values(value)
+            if values is not None:
+                active.append((col, self._selected_codes(col, values)))
+        if not active:
+            return None
+        sizes = [int(np.sum(np.diff(self.offsets[col])[codes])) for col, codes in active]
+        first = int(np.argmin(sizes))
+        col, codes = active[first]
+        offsets, order = self.offsets[col], self.order[col]
+        parts = [order[offsets[c]:offsets[c + 1]] for c in codes]
+        rows = np.concatenate(parts) if parts else np.empty(0, dtype=order.dtype)
+        if len(parts) > 1:
+            rows.sort()
+        for i, (col, codes) in enumerate(active):
+            if i == first or len(rows) == 0:
+                continue
+            allowed = np.zeros(len(self.values[col]) + 1, dtype=bool)
+            allowed[codes] = True
+            rows = rows[allowed[self.codes[col][rows]]]
+        return rows
+
+    def count(self, filters: dict = None) -> int:
+        rows = self.select(filters)
+        return self.n if rows is None else len(rows)
+
+    @staticmethod
+    def take(df: pd.DataFrame, rows, columns=None) -> pd.DataFrame:
+        """Materialize selected rows (optionally only some columns); rows=None returns df itself."""
+        if rows is None:
+            return df if columns is None else df[columns]
+        if columns is None:
+            return df.iloc[rows]
+        return df.iloc[rows, [df.columns.get_loc(c) for c in columns if c in df.columns]]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for d in (self.codes, self.order, self.offsets) for a in d.values())
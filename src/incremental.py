@@ -0,0 +1,110 @@
+# src/incremental.py
+# Incremental append mode: fold new sales rows into persisted aggregates without a full recompute.
+#
+# State is the sales cube (see cube.py) plus the OrderID/CustomerID sketches (see sketches.py).
+# Both merge associatively and commutatively, so batches can arrive in any order, including
+# late rows for months that were already closed, and the result matches a full rebuild over all
+# rows (sums up to floating-point summation order, sketches and counts exactly).
+import pickle
+from pathlib import Path
+
+import pandas as pd
+
+from analytics import prepare_frame, kpis, monthly_revenue, top_products, revenue_by_region
+from cube import build_cube, merge_cubes, apply_filters
+from sketches import SketchTable
+
+DISTINCT_COLUMNS = ('OrderID', 'CustomerID')
+
+class IncrementalAggregates:
+    def __init__(self, cube: pd.DataFrame = None, sketches: dict = None):
+        self.cube = cube if cube is not None else merge_cubes()
+        self.sketches = sketches or {}
+        self.batches = 0
+        self.rows = int(self.cube['Rows'].sum()) if 'Rows' in self.cube.columns else 0
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "IncrementalAggregates":
+        """Full build from an already prepared frame (output of load_and_prepare)."""
+        agg = cls(build_cube(df), {c: SketchTable.build(df, c) for c in DISTINCT_COLUMNS if c in df.columns})
+        agg.batches = 1
+        return agg
+
+    def append(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """Validate a batch of raw rows with load_and_prepare's rules and fold it in.
+
+        Returns the prepared batch (rows with unparseable dates are dropped, as in a full load).
+        """
+        batch = prepare_frame(rows.copy())
+        if batch.empty:
+            return batch
+        self.cube = merge_cubes(self.cube, build_cube(batch))
+        for col in DISTINCT_COLUMNS:
+            if col not in batch.columns:
+                continue
+            sketch = SketchTable.build(batch, col)
+            self.sketches[col] = self.sketches[col].merge(sketch) if col in self.sketches else sketch
+        self.batches += 1
+        self.rows += len(batch)
+        return batch
+
+    def cells(self, filters: dict = None) -> pd.DataFrame:
+        return apply_filters(self.cube, filters)
+
+    def kpis(self, filters: dict = None) -> dict:
+        """KPIs from the cube and sketches.
+
+        Distinct counts (and so the average order value) are None for filters the sketches don't cover
+        (see SketchTable.covers, e.g. a Product filter): the rows they would be counted from aren't kept.
+        """
+        uncovered = {col for col, sketch in self.sketches.items() if not sketch.covers(filters)}
+        counts = {col: self.sketches[col].count(filters) if col in self.sketches and col not in uncovered else None
+                  for col in DISTINCT_COLUMNS}
+        result = kpis(self.cells(filters), orders=counts['OrderID'], customers=counts['CustomerID'])
+        if 'OrderID' in uncovered:
+            result.update(total_orders=None, avg_order_value=None)
+        return result
+
+    def summary(self, filters: dict = None, n: int = 10) -> dict:
+        """Current KPIs, monthly/region series and top-N product ranking for a filter state."""
+        cells = self.cells(filters)
+        return {
+            "kpis": self.kpis(filters),
+            "monthly_revenue": monthly_revenue(cells),
+            "revenue_by_region": revenue_by_region(cells),
+            "top_products": top_products(cells, n=n),
+        }
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+
+    @staticmethod
+    def load(path) -> "IncrementalAggregates":
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+def append_csv(state_path, csv_path) -> IncrementalAggregates:
+    """Fold a CSV of new rows into the aggregates persisted at state_path (created if missing)."""
+    state_path = Path(state_path)
+    agg = IncrementalAggregates.load(state_path) if state_path.exists() else IncrementalAggregates()
+    agg.append(pd.read_csv(csv_path))
+    agg.save(state_path)
+    return agg
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Fold new sales rows into persisted aggregates.")
+    parser.add_argument("state", help="aggregate state file (created on first use)")
+    parser.add_argument("csv", nargs="+", help="CSV batches of new rows, applied in order")
+    args = parser.parse_args()
+    # go through the importable module, so the state file pickles incremental.IncrementalAggregates
+    # rather than __main__.IncrementalAggregates, which nothing else could load
+    import incremental
+    for csv_path in args.csv:
+        agg = incremental.append_csv(args.state, csv_path)
+        print(f"{csv_path}: {agg.rows:,} rows in {agg.batches} batches -> {agg.kpis()}")
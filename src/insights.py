@@ -0,0 +1,114 @@
+# src/insights.py
+# Insights engine behind analytics.auto_insights.
+#
+# One pass over the rows builds dense month x product and month x region revenue matrices
+# (np.bincount on integer codes); every insight is then a vectorized slice of those matrices.
+# Each insight reports how long it took. The input can be rows or cube cells (the matrices are sums).
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics import percent_change
+
+ANOMALY_Z = 2.0
+
+def _codes(values: pd.Series):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.cat.remove_unused_categories()
+        return values.cat.codes.to_numpy(), np.asarray(values.cat.categories)
+    codes, labels = pd.factorize(values, sort=True)
+    return codes, np.asarray(labels)
+
+class InsightMatrix:
+    """Revenue by month (rows, only months with data, ascending) x product and x region."""
+
+    def __init__(self, df: pd.DataFrame):
+        month_key = df['Month'].dt.year.to_numpy() * 12 + df['Month'].dt.month.to_numpy() - 1
+        self.month_keys, month_idx = np.unique(month_key, return_inverse=True)
+        revenue = df['Revenue'].to_numpy(dtype=np.float64)
+        self.product, self.products = self._matrix(month_idx, *_codes(df['Product']), revenue)
+        self.region, self.regions = self._matrix(month_idx, *_codes(df['Region']), revenue)
+
+    def _matrix(self, month_idx, codes, labels, revenue):
+        keep = codes >= 0  # rows with a missing label are left out, as in a group-by
+        n_months, n_labels = len(self.month_keys), len(labels)
+        flat = np.bincount(month_idx[keep] * n_labels + codes[keep], weights=revenue[keep], minlength=n_months * n_labels)
+        return flat.reshape(n_months, n_labels), labels
+
+    def month_label(self, i) -> str:
+        key = int(self.month_keys[i])
+        return pd.Period(year=key // 12, month=key % 12 + 1, freq='M').strftime('%b %Y')
+
+def mom_top_product(m: InsightMatrix):
+    if len(m.month_keys) < 2 or not m.products.size:
+        return None
+    last, prev = m.product[-1], m.product[-2]
+    top = int(np.argmax(last))
+    change = percent_change(last[top], prev[top])
+    if change is None:
+        return None
+    return (f"Top product in {m.month_label(-1)} was **{m.products[top]}** with revenue ${last[top]:,.0f} "
+            f"({change:+.1f}% vs previous month).")
+
+def region_share(m: InsightMatrix):
+    totals = m.region.sum(axis=0)
+    if not totals.size or totals.sum() == 0:
+        return None
+    top = int(np.argmax(totals))
+    return f"Top region: **{m.regions[top]}** contributing {totals[top] / totals.sum() * 100:.1f}% of total revenue."
+
+def fastest_growing(m: InsightMatrix):
+    if len(m.month_keys) < 4:
+        return None
+    last3, prev3 = m.product[-3:].sum(axis=0), m.product[-6:-3].sum(axis=0)
+    valid = prev3 != 0
+    if not valid.any():
+        return None
+    growth = np.full(len(last3), -np.inf)
+    growth[valid] = (last3[valid] - prev3[valid]) / prev3[valid]
+    top = int(np.argmax(growth))
+    return f"Fastest growing product (last 3 months vs previous 3 months): **{m.products[top]}** (+{growth[top]:.1%})."
+
+def biggest_decliner(m: InsightMatrix):
+    if len(m.month_keys) < 2 or not m.products.size:
+        return None
+    drop = m.product[-1] - m.product[-2]
+    worst = int(np.argmin(drop))
+    if drop[worst] >= 0:
+        return None
+    change = percent_change(m.product[-1][worst], m.product[-2][worst])
+    return (f"Biggest decliner in {m.month_label(-1)}: **{m.products[worst]}** "
+            f"(-${-drop[worst]:,.0f}, {change:+.1f}% vs previous month).")
+
+def anomaly_months(m: InsightMatrix):
+    totals = m.product.sum(axis=1)
+    if len(totals) < 6 or totals.std() == 0:
+        return None
+    z = (totals - totals.mean()) / totals.std()
+    flagged = np.flatnonzero(np.abs(z) >= ANOMALY_Z)
+    if not flagged.size:
+        return None
+    parts = [f"**{m.month_label(i)}** (${totals[i]:,.0f}, {z[i]:+.1f}σ)" for i in flagged]
+    return "Unusual months vs the monthly average: " + ", ".join(parts) + "."
+
+INSIGHTS = [
+    ("mom_top_product", mom_top_product),
+    ("region_share", region_share),
+    ("fastest_growing", fastest_growing),
+    ("biggest_decliner", biggest_decliner),
+    ("anomaly_months", anomaly_months),
+]
+
+def insights_report(df: pd.DataFrame) -> list:
+    """[{name, text, seconds}] for every insight that applies."""
+    if df.empty:
+        return []
+    t0 = time.perf_counter()
+    matrix = InsightMatrix(df)
+    report = [{"name": "matrix", "text": None, "seconds": time.perf_counter() - t0}]
+    for name, fn in INSIGHTS:
+        t0 = time.perf_counter()
+        text = fn(matrix)
+        report.append({"name": name, "text": text, "seconds": time.perf_counter() - t0})
+    return report
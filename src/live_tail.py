@@ -0,0 +1,166 @@
+# src/live_tail.py
+# Live-tailing mode: follow a CSV that is being appended to and keep aggregates current.
+#
+# CsvTail remembers the byte offset it has consumed, so each poll reads only what was appended since
+# the previous one; a trailing partial line is held back until its newline arrives, and a file that
+# shrinks or is replaced (truncation, log rotation) is read again from the start. LiveTailer polls on
+# a background thread and folds every batch into IncrementalAggregates, which applies the
+# load_and_prepare cleaning rules, so the cost of a refresh follows the rows added, not the file size.
+# Fields containing quoted newlines are not supported.
+#
+# Run: python src/live_tail.py data/sample_sales_data.csv --interval 2
+import io
+import os
+import threading
+import time
+
+import pandas as pd
+
+from incremental import IncrementalAggregates
+
+DEFAULT_INTERVAL = 2.0
+MAX_READ_BYTES = 64 * 1024**2  # per read, so catching up on a large file happens in bounded batches
+
+class CsvTail:
+    def __init__(self, path, max_bytes: int = MAX_READ_BYTES):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self._reset()
+
+    def _reset(self):
+        self.offset, self.header, self._partial, self._inode = 0, None, b"", None
+
+    def resume(self, offset: int) -> "CsvTail":
+        """Continue after the first `offset` bytes of the file (whole lines already loaded some other way)."""
+        with open(self.path, "rb") as f:
+            self.header = f.readline()
+        self.offset, self._inode = offset, os.stat(self.path).st_ino
+        return self
+
+    def pending_bytes(self) -> int:
+        try:
+            return max(os.stat(self.path).st_size - self.offset, 0)
+        except FileNotFoundError:
+            return 0
+
+    def read_new(self):
+        """(rows appended since the last call as a raw DataFrame, whether the file was reset)."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return pd.DataFrame(), False
+        reset = self._inode is not None and (st.st_ino != self._inode or st.st_size < self.offset)
+        if reset:
+            self._reset()
+        self._inode = st.st_ino
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(self.max_bytes)
+        self.offset += len(data)
+        data = self._partial + data
+        end = data.rfind(b"\n") + 1
+        complete, self._partial = data[:end], data[end:]
+        if self.header is None:
+            if not complete:
+                return pd.DataFrame(), reset
+            self.header, complete = complete.split(b"\n", 1)
+            self.header += b"\n"
+        if not complete.strip():
+            return pd.DataFrame(), reset
+        return pd.read_csv(io.BytesIO(self.header + complete)), reset
+
+class LiveTailer:
+    def __init__(self, path, interval: float = DEFAULT_INTERVAL, max_bytes: int = MAX_READ_BYTES):
+        self.tail = CsvTail(path, max_bytes)
+        self.interval = interval
+        self.aggregates = IncrementalAggregates()
+        self.lock = threading.Lock()
+        self.resets = 0
+        self.last_batch = {"rows": 0, "seconds": 0.0, "at": None}
+        self.last_lag = 0.0
+        self.started = time.time()  # rows written before this were backfill, not late
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self) -> int:
+        """Fold everything appended since the last poll into the aggregates; returns rows added."""
+        added = 0
+        while True:
+            t0 = time.perf_counter()
+            raw, reset = self.tail.read_new()
+            if reset:
+                with self.lock:
+                    self.aggregates = IncrementalAggregates()
+                    self.resets += 1
+            if raw.empty:
+                break
+            with self.lock:
+                batch = self.aggregates.append(raw)
+            added += len(batch)
+            now = time.time()
+            self.last_batch = {"rows": len(batch), "seconds": time.perf_counter() - t0, "at": now}
+            self.last_lag = self._waiting(now)
+            if not self.tail.pending_bytes():
+                break
+        return added
+
+    def _waiting(self, now: float) -> float:
+        # time since the file was last written, counted from when tailing started at the earliest
+        try:
+            return max(now - max(os.stat(self.tail.path).st_mtime, self.started), 0.0)
+        except FileNotFoundError:
+            return 0.0
+
+    def lag(self) -> float:
+        """Seconds the newest unprocessed append has been waiting (last batch's lag when caught up)."""
+        return self._waiting(time.time()) if self.tail.pending_bytes() else self.last_lag
+
+    def status(self) -> dict:
+        return {"rows": self.aggregates.rows, "batches": self.aggregates.batches, "offset": self.tail.offset,
+                "pending_bytes": self.tail.pending_bytes(), "lag_seconds": self.lag(), "resets": self.resets,
+                "last_batch": dict(self.last_batch)}
+
+    def snapshot(self, filters: dict = None, n: int = 10) -> dict:
+        """Consistent summary of the current aggregates (see IncrementalAggregates.summary)."""
+        with self.lock:
+            if self.aggregates.cube.empty:
+                return None
+            return self.aggregates.summary(filters, n=n)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except (OSError, ValueError, pd.errors.ParserError) as e:
+                print(f"live tail: poll of {self.tail.path} failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> "LiveTailer":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"live-tail {self.tail.path}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Follow a growing sales CSV and print KPIs as rows arrive.")
+    parser.add_argument("csv")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    args = parser.parse_args()
+    tailer = LiveTailer(args.csv, args.interval)
+    try:
+        while True:
+            added = tailer.poll()
+            if added:
+                status = tailer.status()
+                print(f"+{added:,} rows ({status['rows']:,} total, lag {status['lag_seconds']:.1f}s): "
+                      f"{tailer.snapshot()['kpis']}")
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
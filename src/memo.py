@@ -0,0 +1,106 @@
+# src/memo.py
+# Process-wide memoization of analytics results.
+#
+# Streamlit re-executes the app script for every session and rerun, but imported modules live for the
+# whole server process, so a cache held here is shared by all sessions: analysts looking at the same
+# dataset version and filter state reuse one result. Entries are bounded by an estimated byte budget
+# with LRU eviction and are dropped as soon as a dataset is seen with a new version.
+# Cached objects are shared, so callers must treat them as read-only.
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from cube import filter_values
+
+DEFAULT_BUDGET_BYTES = int(os.environ.get("SALES_MEMO_MAX_BYTES", 256 * 1024**2))
+
+def normalize_filters(filters: dict = None) -> tuple:
+    """Hashable, order-insensitive form of a filter dict; unrestricted columns are dropped."""
+    items = []
+    for col, value in sorted((filters or {}).items()):
+        values = filter_values(value)
+        if values is not None:
+            items.append((col, tuple(sorted(values, key=str))))
+    return tuple(items)
+
+def sizeof(obj) -> int:
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(sizeof(k) + sizeof(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(sizeof(v) for v in obj)
+    return sys.getsizeof(obj)
+
+class MemoCache:
+    def __init__(self, max_bytes: int = DEFAULT_BUDGET_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+        self._entries = OrderedDict()  # key -> (value, size, dataset)
+        self._versions = {}            # dataset -> latest version seen
+        self._lock = threading.Lock()
+
+    def _check_version(self, dataset, version):
+        if self._versions.get(dataset, version) != version:
+            stale = [k for k, (_, _, ds) in self._entries.items() if ds == dataset]
+            for k in stale:
+                self.bytes -= self._entries.pop(k)[1]
+            self.invalidations += len(stale)
+        self._versions[dataset] = version
+
+    def get_or_compute(self, key, dataset, version, compute):
+        """Return the cached value for (dataset, version, key), calling compute() on a miss."""
+        full_key = (dataset, version, key)
+        with self._lock:
+            self._check_version(dataset, version)
+            if full_key in self._entries:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return self._entries[full_key][0]
+            self.misses += 1
+        # computed outside the lock; two sessions racing on one key both compute, the last one is kept
+        value = compute()
+        size = sizeof(value)
+        with self._lock:
+            if size > self.max_bytes or self._versions.get(dataset) != version:
+                return value
+            if full_key in self._entries:
+                self.bytes -= self._entries.pop(full_key)[1]
+            self._entries[full_key] = (value, size, dataset)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, old_size, _) = self._entries.popitem(last=False)
+                self.bytes -= old_size
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+# shared by every caller (and every Streamlit session) in this process
+MEMO = MemoCache()
@@ -0,0 +1,130 @@
+# src/parallel.py
+# Parallel partition aggregation for the analytics functions.
+#
+# The parent turns the group-by keys into one integer code per row, puts codes and measures in
+# shared memory and hands each worker a row range; workers attach to the shared blocks (nothing
+# large is pickled), compute partial sums/counts with np.bincount and return them. The parent adds
+# the partials up and rebuilds the same index the serial pandas group-by would produce, so results
+# match the serial functions up to floating-point summation order.
+#
+# With one worker, or fewer than PARALLEL_MIN_ROWS rows, the same bincounts run in the calling process:
+# below that size copying into shared memory and the round trip to the pool cost more than they save.
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+PARALLEL_MIN_ROWS = int(os.environ.get("SALES_PARALLEL_MIN_ROWS", 500_000))
+
+_POOLS = {}
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    # pools are kept per size: starting processes costs far more than one aggregation
+    if workers not in _POOLS:
+        _POOLS[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _POOLS[workers]
+
+def shutdown():
+    for pool in _POOLS.values():
+        pool.shutdown()
+    _POOLS.clear()
+
+def _codes(values: pd.Series):
+    """(codes, labels builder) for a key column; categoricals reuse their codes."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        dtype = values.dtype
+        return values.cat.codes.to_numpy().astype(np.int64), \
+            lambda idx: pd.CategoricalIndex(dtype.categories[idx], categories=dtype.categories, ordered=dtype.ordered, name=values.name)
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes.astype(np.int64), lambda idx: pd.Index(uniques[idx], name=values.name)
+
+class _Shared:
+    """Numpy arrays copied once into shared memory blocks, described by picklable specs."""
+
+    def __init__(self, **arrays):
+        self.blocks, self.specs = [], {}
+        for name, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[...] = arr
+            self.blocks.append(shm)
+            self.specs[name] = (shm.name, arr.shape, arr.dtype.str)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        for shm in self.blocks:
+            shm.close()
+            shm.unlink()
+
+def _attach(specs):
+    blocks, arrays = [], {}
+    for name, (shm_name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(shm)
+        arrays[name] = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+    return blocks, arrays
+
+def _bincounts(arrays, start, stop, nbins):
+    """Per-group sums of every measure plus row counts over rows [start, stop)."""
+    codes = arrays["codes"][start:stop]
+    keep = codes >= 0
+    codes = codes[keep]
+    out = {"__count__": np.bincount(codes, minlength=nbins)}
+    for name, values in arrays.items():
+        if name != "codes":
+            out[name] = np.bincount(codes, weights=values[start:stop][keep], minlength=nbins)
+    return out
+
+def _partial(specs, start, stop, nbins):
+    """Worker: _bincounts over the shared blocks."""
+    blocks, arrays = _attach(specs)
+    try:
+        return _bincounts(arrays, start, stop, nbins)
+    finally:
+        del arrays
+        for shm in blocks:
+            shm.close()
+
+def _ranges(n: int, parts: int):
+    bounds = np.linspace(0, n, parts + 1).astype(int)
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+def groupby_sums(df: pd.DataFrame, keys, measures=('Revenue',), workers: int = None) -> pd.DataFrame:
+    """Parallel df.groupby(keys, observed=True)[measures].sum(), plus a __count__ column of rows per group."""
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    workers = workers or os.cpu_count() or 1
+    coded = [_codes(df[k]) for k in keys]
+    sizes = [int(c.max()) + 1 if len(c) and c.max() >= 0 else 1 for c, _ in coded]
+    combined = np.zeros(len(df), dtype=np.int64)
+    missing = np.zeros(len(df), dtype=bool)
+    for (codes, _), size in zip(coded, sizes):
+        combined = combined * size + codes
+        missing |= codes < 0
+    combined[missing] = -1  # rows with a missing key are dropped, like pandas' dropna=True
+    nbins = int(np.prod(sizes))
+
+    arrays = {"codes": combined, **{m: df[m].to_numpy(dtype=np.float64) for m in measures}}
+    if workers == 1 or len(df) < PARALLEL_MIN_ROWS:
+        partials = [_bincounts(arrays, 0, len(df), nbins)]
+    else:
+        with _Shared(**arrays) as shared:
+            futures = [_pool(workers).submit(_partial, shared.specs, a, b, nbins) for a, b in _ranges(len(df), workers)]
+            partials = [f.result() for f in futures]
+    totals = {name: np.sum([p[name] for p in partials], axis=0) if partials else np.zeros(nbins)
+              for name in ["__count__", *measures]}
+
+    present = np.flatnonzero(totals["__count__"] > 0)
+    positions = np.unravel_index(present, sizes)
+    levels = [make(pos) for (_, make), pos in zip(coded, positions)]
+    index = levels[0] if len(levels) == 1 else pd.MultiIndex.from_arrays(levels)
+    return pd.DataFrame({name: totals[name][present] for name in [*measures, "__count__"]}, index=index)
+
+def nunique(values: pd.Series, workers: int = None) -> int:
+    """Distinct non-null values: counted from shared-memory codes for categoricals, else by hashing in the parent."""
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return int(values.nunique())
+    return len(groupby_sums(values.to_frame(), values.name, (), workers))
@@ -0,0 +1,160 @@
+# src/render_server.py
+# Warm render server for per-report exports.
+#
+# A cold export spends most of its time before it draws anything: starting the interpreter, importing
+# pandas/matplotlib/seaborn, loading fonts and preparing the dataset. The server pays that once. It
+# keeps one Engine (prepared rows, cube, filter index) and a warmed-up matplotlib, and renders jobs
+# sent over a local Unix socket. Requests and responses are one JSON object per line, and a client may
+# send several jobs on one connection. Jobs are rendered one at a time, in arrival order. The dataset
+# is reloaded when its content changes (get_engine). The client side imports only the standard
+# library, so a cron job's `submit` starts in milliseconds.
+#
+# Run: python src/render_server.py serve data/sample_sales_data.csv &
+#      python src/render_server.py submit --filters '{"Region": "North", "Year": 2025}' --out north.png north.pdf
+#      python src/render_server.py status | shutdown
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "sales_dashboard_render.sock")
+
+class RenderServer(socketserver.UnixStreamServer):
+    def __init__(self, socket_path, data_path, backend="pandas"):
+        os.environ.setdefault("MPLBACKEND", "Agg")
+        from engine import get_engine
+        self.get_engine = get_engine
+        self.data_path, self.backend = str(data_path), backend
+        self.started, self.jobs = time.time(), 0
+        self.warm()
+        _remove_stale(socket_path)
+        super().__init__(socket_path, RenderHandler)
+
+    def warm(self):
+        """Load the dataset and its derived structures and draw one throwaway report (imports, fonts)."""
+        import io
+        from dashboard_static import render_static_dashboard
+        t0 = time.perf_counter()
+        engine = self.get_engine(self.data_path, self.backend).warm()
+        render_static_dashboard(engine.dashboard_aggregates(), [io.BytesIO()], dpi=50, fmt="png")
+        print(f"render server: warm in {time.perf_counter() - t0:.2f}s ({engine.count():,} rows)")
+
+    def render(self, job: dict) -> dict:
+        from batch_export import report_aggregates
+        from dashboard_static import render_static_dashboard
+        t0 = time.perf_counter()
+        engine = self.get_engine(self.data_path, self.backend)
+        filters = job.get("filters") or {}
+        aggs = report_aggregates(engine, filters)
+        if aggs is None:
+            return {"ok": False, "error": f"no rows match {filters}"}
+        outputs = [str(p) for p in job["out"]]
+        for p in outputs:
+            Path(p).parent.mkdir(parents=True, exist_ok=True)
+        render_static_dashboard(aggs, outputs, dpi=job.get("dpi", 300),
+                                title=job.get("title", "Sales Data Dashboard — Portfolio Export"))
+        self.jobs += 1
+        return {"ok": True, "seconds": time.perf_counter() - t0, "outputs": outputs}
+
+    def handle_request_line(self, line: bytes) -> dict:
+        try:
+            request = json.loads(line)
+            op = request.get("op", "render")
+            if op == "render":
+                return self.render(request)
+            if op == "status":
+                return {"ok": True, "data": self.data_path, "backend": self.backend, "jobs": self.jobs,
+                        "uptime": time.time() - self.started, "pid": os.getpid()}
+            if op == "shutdown":
+                # shutdown() waits for serve_forever, which is running this handler
+                threading.Thread(target=self.shutdown, daemon=True).start()
+                return {"ok": True}
+            return {"ok": False, "error": f"unknown op {op!r}"}
+        except Exception as e:  # a bad job must not take the server down
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+class RenderHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if line.strip():
+                self.wfile.write(json.dumps(self.server.handle_request_line(line)).encode() + b"\n")
+                self.wfile.flush()
+
+def _remove_stale(socket_path):
+    """Unlink a socket file nobody is listening on; refuse to start next to a live server."""
+    if not os.path.exists(socket_path):
+        return
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)
+    else:
+        raise SystemExit(f"a render server is already listening on {socket_path}")
+
+def serve(data_path, socket_path=DEFAULT_SOCKET, backend="pandas"):
+    server = RenderServer(socket_path, data_path, backend)
+    print(f"render server: listening on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+def submit(requests, socket_path=DEFAULT_SOCKET) -> list:
+    """Send requests (dicts) over one connection; returns one response per request."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(socket_path)
+        f = s.makefile("rwb")
+        responses = []
+        for request in requests:
+            f.write(json.dumps(request).encode() + b"\n")
+            f.flush()
+            responses.append(json.loads(f.readline()))
+        return responses
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm render server for dashboard exports.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("serve", help="load the dataset and render jobs until shut down")
+    p.add_argument("data_path", nargs="?", default="data/sample_sales_data.csv")
+    # the backend names come from the engine, which (with pandas) is only imported to serve, so the
+    # client commands keep their standard-library-only start-up
+    if "serve" in sys.argv[1:]:
+        from engine import BACKENDS
+        p.add_argument("--backend", choices=sorted(BACKENDS), default="pandas", help="analytics execution backend")
+    p = sub.add_parser("submit", help="render one report on a running server")
+    p.add_argument("--filters", type=json.loads, default={}, help='JSON object, e.g. {"Region": "North", "Year": 2025}')
+    p.add_argument("--out", nargs="+", required=True, help="output paths; the format follows the suffix")
+    p.add_argument("--dpi", type=int, default=300)
+    p.add_argument("--title")
+    sub.add_parser("status")
+    sub.add_parser("shutdown")
+    args = parser.parse_args()
+    if args.command == "serve":
+        serve(args.data_path, args.socket, args.backend)
+        sys.exit()
+    if args.command == "submit":
+        request = {"filters": args.filters, "out": [str(Path(p).resolve()) for p in args.out], "dpi": args.dpi}
+        if args.title:
+            request["title"] = args.title
+    else:
+        request = {"op": args.command}
+    t0 = time.perf_counter()
+    try:
+        response, = submit([request], args.socket)
+    except OSError as e:
+        sys.exit(f"no render server on {args.socket} ({e}); start one with: python src/render_server.py serve")
+    if not response["ok"]:
+        sys.exit(f"render failed: {response['error']}")
+    print(json.dumps({**response, "round_trip": time.perf_counter() - t0}))
@@ -0,0 +1,133 @@
+# src/windows.py
+# Rolling-window and period-comparison engine on prefix sums.
+#
+# One pass over the monthly cube builds cumulative revenue along the month axis for the total, each
+# Region, each Product and each (Region, Product) pair, with a leading zero so that the revenue of
+# months [a, b) is P[b] - P[a]. Any period comparison (MoM, QoQ, YoY, year-to-date, trailing N
+# months) is then two or four array reads per selected slice instead of a filter + group-by over
+# the fact table. Months are ordinals (year * 12 + month - 1) over a contiguous range, so months
+# without sales simply contribute nothing.
+import numpy as np
+import pandas as pd
+
+from cube import filter_values
+
+DIMENSIONS = ('Region', 'Product')
+PERIODS = {
+    "MoM": "month vs previous month",
+    "QoQ": "quarter to date vs same months of the previous quarter",
+    "YoY": "calendar year (through the anchor month) vs the whole previous year",
+    "YTD": "year to date vs the same months of the previous year",
+    "T3M": "trailing 3 months vs the 3 before",
+    "T12M": "trailing 12 months vs the 12 before",
+}
+
+def month_ordinal(ts) -> int:
+    ts = pd.Timestamp(ts)
+    return ts.year * 12 + ts.month - 1
+
+def month_label(ordinal: int) -> str:
+    return f"{ordinal // 12}-{ordinal % 12 + 1:02d}"
+
+def trailing_mean(series: pd.Series, window: int = 3, min_periods: int = 1) -> pd.Series:
+    """series.rolling(window, min_periods).mean() from one cumulative sum."""
+    values = series.to_numpy(dtype=np.float64)
+    csum = np.concatenate([[0.0], np.cumsum(values)])
+    n = np.arange(1, len(values) + 1)
+    count = np.minimum(n, window)
+    means = (csum[n] - csum[n - count]) / count
+    means[count < min_periods] = np.nan
+    return pd.Series(means, index=series.index, name=series.name)
+
+class WindowEngine:
+    def __init__(self, first: int, labels: dict, prefix: dict):
+        self.first = first      # ordinal of the first month
+        self.labels = labels    # dim -> {value: position}
+        self.prefix = prefix    # () / (dim,) / DIMENSIONS -> cumulative array, month axis last
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dims=DIMENSIONS) -> "WindowEngine":
+        """Build from prepared rows or cube cells (needs Month, Revenue and the dims)."""
+        dims = tuple(d for d in dims if d in df.columns)
+        month = df['Month'].dt.year.to_numpy() * 12 + df['Month'].dt.month.to_numpy() - 1
+        first = int(month.min()) if len(df) else 0
+        n_months = int(month.max()) - first + 1 if len(df) else 0
+        codes, labels, shape = [], {}, []
+        for d in dims:
+            c, uniques = pd.factorize(df[d], sort=True)
+            codes.append(c)
+            labels[d] = {v: i for i, v in enumerate(uniques)}
+            shape.append(len(uniques))
+        revenue = df['Revenue'].to_numpy(dtype=np.float64)
+        keep = np.all([c >= 0 for c in codes], axis=0) if codes else np.ones(len(df), dtype=bool)
+        flat = np.zeros(len(df), dtype=np.int64)
+        for c, size in zip(codes, shape):
+            flat = flat * size + c
+        flat = flat * n_months + (month - first)
+        dense = np.bincount(flat[keep], weights=revenue[keep], minlength=int(np.prod(shape)) * n_months)
+        dense = dense.reshape(*shape, n_months)
+        # marginals: the total, each dimension on its own and the full joint
+        prefix = {}
+        for key in [(), *((d,) for d in dims), dims]:
+            drop = tuple(i for i, d in enumerate(dims) if d not in key)
+            cells = dense.sum(axis=drop) if drop else dense
+            prefix[key] = np.concatenate([np.zeros(cells.shape[:-1] + (1,)), np.cumsum(cells, axis=-1)], axis=-1)
+        return cls(first, labels, prefix)
+
+    @property
+    def last(self) -> int:
+        """Ordinal of the last month covered."""
+        return self.first + self.prefix[()].shape[-1] - 2
+
+    def _selection(self, filters):
+        key, index = [], []
+        for d in self.labels:
+            values = filter_values((filters or {}).get(d))
+            if values is not None:
+                key.append(d)
+                index.append([self.labels[d][v] for v in values if v in self.labels[d]])
+        return tuple(key), index
+
+    def range_sum(self, start: int, stop: int, filters: dict = None) -> float:
+        """Revenue of months [start, stop) (ordinals) for a Region/Product selection."""
+        key, index = self._selection(filters)
+        prefix = self.prefix[key]
+        a = int(np.clip(start - self.first, 0, prefix.shape[-1] - 1))
+        b = int(np.clip(stop - self.first, 0, prefix.shape[-1] - 1))
+        if b <= a:
+            return 0.0
+        sel = prefix[np.ix_(*index)] if index else prefix
+        return float(np.sum(sel[..., b] - sel[..., a]))
+
+    def windows(self, period: str, anchor: int) -> tuple:
+        """((start, stop), (prev_start, prev_stop)) month ranges of a comparison ending at month `anchor`."""
+        end = anchor + 1
+        if period == "MoM":
+            return (anchor, end), (anchor - 1, anchor)
+        if period == "QoQ":
+            start = anchor - anchor % 3
+            return (start, end), (start - 3, end - 3)
+        if period == "YoY":
+            start = anchor - anchor % 12
+            return (start, end), (start - 12, start)
+        if period == "YTD":
+            start = anchor - anchor % 12
+            return (start, end), (start - 12, end - 12)
+        if period.startswith("T") and period.endswith("M"):
+            n = int(period[1:-1])
+            return (end - n, end), (end - 2 * n, end - n)
+        raise ValueError(f"unknown period {period!r}; expected one of {', '.join(PERIODS)}")
+
+    def compare(self, period: str, anchor: int = None, filters: dict = None) -> dict:
+        """Current vs previous revenue for a comparison period ending at `anchor` (default: last month)."""
+        anchor = self.last if anchor is None else anchor
+        (a, b), (pa, pb) = self.windows(period, anchor)
+        current, previous = self.range_sum(a, b, filters), self.range_sum(pa, pb, filters)
+        return {
+            "period": period,
+            "current": current,
+            "previous": previous,
+            "change_pct": (current - previous) / previous * 100.0 if previous else None,
+            "current_range": (month_label(a), month_label(b - 1)),
+            "previous_range": (month_label(pa), month_label(pb - 1)),
+        }
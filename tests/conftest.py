@@ -0,0 +1,25 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "src")]
+# keep prepared-data cache entries and content hashes of test files out of the working tree
+os.environ.setdefault("SALES_CACHE_DIR", tempfile.mkdtemp(prefix="sales-cache-"))
+
+from generate_sample_data import write_dataset  # noqa: E402
+
+@pytest.fixture
+def sales_csv(tmp_path):
+    """Two years of synthetic sales, with a few dirty rows, as a CSV in a fresh directory."""
+    path = tmp_path / "sales.csv"
+    write_dataset(path, 3000, seed=7, start=pd.Timestamp("2023-01-01"), days=730, products=25, dirty_rate=0.01)
+    return path
+
+@pytest.fixture
+def sales_raw(sales_csv) -> pd.DataFrame:
+    return pd.read_csv(sales_csv)
@@ -0,0 +1,25 @@
+import pytest
+
+from analytics import iter_chunks
+from dataset import partition_csv
+
+def prepared_rows(path) -> int:
+    return sum(len(chunk) for chunk in iter_chunks(path))
+
+def test_partitioning_again_replaces_partitions(sales_csv, tmp_path):
+    root = tmp_path / "parts"
+    first = partition_csv(sales_csv, root, chunksize=700)
+    again = partition_csv(sales_csv, root, chunksize=700)
+    assert sum(f["rows"] for f in again.files) == prepared_rows(sales_csv)
+    assert [f["path"] for f in again.files] == [f["path"] for f in first.files]
+    assert again.summary()["kpis"] == pytest.approx(first.summary()["kpis"])
+    assert not list(root.rglob("*.tmp"))
+
+def test_partitioning_a_shorter_source_drops_stale_partitions(sales_csv, sales_raw, tmp_path):
+    root = tmp_path / "parts"
+    partition_csv(sales_csv, root, name="sales")
+    head = tmp_path / "head.csv"
+    sales_raw.iloc[:500].to_csv(head, index=False)
+    ds = partition_csv(head, root, name="sales")
+    assert sum(f["rows"] for f in ds.files) == prepared_rows(head)
+    assert sum(len(chunk) for chunk in ds.scan()) == prepared_rows(head)
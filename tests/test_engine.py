@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+import analytics
+from engine import Engine
+
+FILTERS = [{}, {'Year': 2024}, {'Region': ['North', 'East'], 'Product': 'Eta Laptop Sleeve'}]
+FUNCTIONS = ['monthly_revenue', 'top_products', 'revenue_by_region', 'category_share', 'monthly_pivot']
+
+@pytest.fixture
+def eng(sales_csv):
+    return Engine(sales_csv, use_cache=False)
+
+def assert_same(got, expected):
+    if isinstance(got, pd.DataFrame):
+        pd.testing.assert_frame_equal(got, expected, check_dtype=False, check_names=False)
+    else:
+        pd.testing.assert_series_equal(got, expected, check_dtype=False, check_names=False, check_index_type=False)
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_cube_answers_match_rows(eng, filters, monkeypatch):
+    sub = eng.filtered(filters)
+    # covered selections never visit the rows, except for the exact distinct counts
+    monkeypatch.setattr(eng, "rows", lambda f=None: pytest.fail("rows visited"))
+    for name in FUNCTIONS:
+        assert_same(getattr(eng, name)(filters), getattr(analytics, name)(sub))
+    if eng.sketches['OrderID'].covers(filters):
+        assert eng.kpis(filters, exact=False) == pytest.approx(analytics.kpis(
+            sub, orders=eng.sketches['OrderID'].count(filters), customers=eng.sketches['CustomerID'].count(filters)))
+    assert eng.auto_insights(filters) == analytics.auto_insights(sub)
+    monkeypatch.undo()
+    assert eng.kpis(filters, exact=True) == pytest.approx(analytics.kpis(sub))
+
+def test_filters_outside_the_cube_use_rows(eng):
+    customer = eng.df['CustomerID'].mode()[0]
+    filters = {'CustomerID': customer, 'Year': [2023, 2024]}
+    assert not eng.on_cube(filters)
+    sub = eng.df[eng.df['CustomerID'] == customer]
+    assert eng.kpis(filters) == pytest.approx(analytics.kpis(sub))
+    assert_same(eng.top_products(filters, n=3), analytics.top_products(sub, n=3))
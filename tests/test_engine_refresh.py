@@ -0,0 +1,150 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import engine
+from conftest import ROOT
+from engine import Engine
+from filter_index import FilterIndex
+from test_incremental import cube_state
+
+FILTERS = [{}, {'Year': 2024}, {'Region': ['North', 'East']}, {'Year': 2023, 'Region': 'West', 'Product': 'Eta Laptop Sleeve'}]
+
+@pytest.fixture
+def growing_csv(sales_csv, tmp_path):
+    """(path holding the first 2000 rows of sales_csv, the remaining lines)."""
+    header, *lines = sales_csv.read_text().splitlines(keepends=True)
+    path = tmp_path / "growing.csv"
+    path.write_text(header + "".join(lines[:2000]))
+    return path, lines[2000:]
+
+def assert_same_engine(eng, expected):
+    pd.testing.assert_frame_equal(cube_state(eng), cube_state(expected), check_dtype=False, check_categorical=False)
+    for col, sketch in expected.sketches.items():
+        assert eng.sketches[col].count() == sketch.count()
+    for filters in FILTERS:
+        np.testing.assert_array_equal(eng.rows(filters), expected.rows(filters))
+        assert eng.kpis(filters, exact=True) == pytest.approx(expected.kpis(filters, exact=True))
+    assert eng.options('Region') == expected.options('Region')
+
+def test_refresh_folds_in_appended_rows(sales_csv, growing_csv):
+    path, rest = growing_csv
+    eng = Engine(path).warm()
+    version = eng.version
+    assert eng.refresh() and eng.version == version  # nothing appended yet
+    with open(path, "a") as f:
+        f.write("".join(rest[:500]))
+        f.write(rest[500][:10])  # a partial line is held back until its newline arrives
+    assert eng.refresh() and eng.version != version
+    with open(path, "a") as f:
+        f.write(rest[500][10:] + "".join(rest[501:]))
+    assert eng.refresh()
+    assert_same_engine(eng, Engine(sales_csv, use_cache=False))
+
+def test_load_leaves_a_half_written_line_to_refresh(sales_csv, growing_csv, tmp_path):
+    path, rest = growing_csv
+    complete = tmp_path / "complete.csv"
+    complete.write_bytes(path.read_bytes())
+    with open(path, "a") as f:
+        f.write(rest[0][:12])
+    eng = Engine(path).warm()
+    assert eng.loaded_bytes == complete.stat().st_size
+    assert_same_engine(eng, Engine(complete, use_cache=False))
+    with open(path, "a") as f:
+        f.write(rest[0][12:] + "".join(rest[1:]))
+    assert eng.refresh()
+    assert_same_engine(eng, Engine(sales_csv, use_cache=False))
+    assert eng.df['OrderID'].is_unique
+
+def test_refresh_with_unseen_values(growing_csv):
+    path, rest = growing_csv
+    header = path.read_text().splitlines(keepends=True)[0]
+    eng = Engine(path).warm()
+    with open(path, "a") as f:
+        f.write(pd.read_csv(io.StringIO(header + rest[0])).assign(Region="Antarctica").to_csv(index=False, header=False))
+    assert eng.refresh()
+    assert 'Antarctica' in eng.options('Region')
+    assert eng.count({'Region': 'Antarctica'}) == 1
+    assert_same_engine(eng, Engine(path, use_cache=False))
+
+def test_refresh_reports_replaced_file(growing_csv):
+    path, rest = growing_csv
+    eng = Engine(path)
+    assert eng.refresh()
+    header, *lines = path.read_text().splitlines(keepends=True)
+    path.write_text(header + "".join(lines[:10]))
+    assert not eng.refresh()
+
+def test_filter_index_append_matches_rebuild(sales_csv):
+    # shuffled, so that the first rows already cover both years
+    df = Engine(sales_csv, use_cache=False).df.sample(frac=1, random_state=1)
+    index = FilterIndex(df.iloc[:1000])
+    assert index.append(df.iloc[1000:])
+    full = FilterIndex(df)
+    for filters in FILTERS:
+        np.testing.assert_array_equal(index.select(filters), full.select(filters))
+    unseen = df.iloc[:1].assign(Product="Hovercraft")
+    assert not index.append(unseen) and index.n == len(df)
+
+def test_streamlit_follows_appends_without_reloading(growing_csv, monkeypatch):
+    path, rest = growing_csv
+    loads = []
+    load_cached = engine.load_cached
+    monkeypatch.setattr(engine, "load_cached", lambda *a, **kw: loads.append(a) or load_cached(*a, **kw))
+    monkeypatch.setenv("SALES_DATA_PATH", str(path))
+    at = AppTest.from_file(str(ROOT / "src" / "dashboard_streamlit.py"), default_timeout=60).run()
+    assert not at.exception
+    with open(path, "a") as f:
+        f.write("".join(rest))
+    at.run()
+    assert not at.exception
+    assert len(loads) == 1
+    expected = Engine(path, use_cache=False).kpis({'Year': at.sidebar.selectbox[0].value}, exact=True)
+    assert at.metric[0].value == f"${expected['total_revenue']:,.0f}"
+
+@pytest.mark.parametrize("backend", ["pandas", "compact"])
+def test_small_refreshes_leave_loaded_rows_alone(sales_csv, growing_csv, backend):
+    path, rest = growing_csv
+    eng = Engine(path, backend).warm()
+    loaded, order = eng._df, eng.index.order['Region']
+    for start in range(0, len(rest), 250):
+        with open(path, "a") as f:
+            f.write("".join(rest[start:start + 250]))
+        assert eng.refresh()
+    assert eng._df is loaded and eng.index.order['Region'] is order
+    expected = Engine(sales_csv, backend, use_cache=False)
+    assert_same_engine(eng, expected)
+    assert eng.auto_insights({'Year': 2024}) == expected.auto_insights({'Year': 2024})
+    assert len(eng.df) == len(expected.df) and eng._df is not loaded  # compacted on request
+
+def test_refresh_compacts_large_appends(sales_csv, growing_csv, monkeypatch):
+    monkeypatch.setattr(engine, "COMPACT_MIN_ROWS", 0)
+    path, rest = growing_csv
+    eng = Engine(path).warm()
+    with open(path, "a") as f:
+        f.write("".join(rest[:100]))  # under COMPACT_FRACTION of the loaded rows
+    assert eng.refresh() and eng._segments
+    with open(path, "a") as f:
+        f.write("".join(rest[100:]))
+    assert eng.refresh() and not eng._segments
+    assert_same_engine(eng, Engine(sales_csv, use_cache=False))
+
+def test_streamlit_live_tail_uses_the_shared_engine(growing_csv, monkeypatch):
+    import live_tail
+    path, rest = growing_csv
+    monkeypatch.setattr(live_tail.LiveTailer, "start", lambda self: pytest.fail("second tailer started"))
+    monkeypatch.setenv("SALES_DATA_PATH", str(path))
+    at = AppTest.from_file(str(ROOT / "src" / "dashboard_streamlit.py"), default_timeout=60).run()
+    at.sidebar.checkbox[1].check().run()
+    assert not at.exception
+    before = Engine(path, use_cache=False).count()
+    with open(path, "a") as f:
+        f.write("".join(rest[:300]))
+    at.run()
+    assert not at.exception
+    after = Engine(path, use_cache=False).count()
+    live = [c.value for c in at.caption if c.value.startswith("🔴 Live")]
+    assert live == [f"🔴 Live: {after:,} rows (+{after - before:,} since the last update), checked at {live[0][-8:]}"]
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from streamlit.testing.v1 import AppTest
+
+import dashboard
+import engine
+from api import create_app
+from conftest import ROOT
+
+YEAR, REGIONS = 2024, ["North", "East"]
+
+@pytest.fixture(params=[10**12, 0], ids=["exact", "sketched"])
+def policy(request, monkeypatch):
+    # every selection counted exactly, or every selection the sketches cover estimated from them
+    monkeypatch.setattr(engine, "EXACT_DISTINCT_ROWS", request.param)
+    return request.param
+
+def cli_kpis(path, monkeypatch) -> dict:
+    seen = {}
+
+    def summary_text(df=None, kp=None):
+        seen["kpis"] = kp
+        return ""
+    monkeypatch.setattr(dashboard, "DATA_PATH", path)
+    monkeypatch.setattr(dashboard, "plot_dashboard", lambda *args: None)
+    monkeypatch.setattr(dashboard, "summary_text", summary_text)
+    dashboard.main(["--year", str(YEAR), "--region", *REGIONS])
+    return seen["kpis"]
+
+def api_kpis(path) -> dict:
+    async def fetch():
+        async with TestClient(TestServer(create_app(path, reload_interval=0))) as client:
+            resp = await client.get("/kpis", params=[("year", str(YEAR))] + [("region", r) for r in REGIONS])
+            assert resp.status == 200
+            return (await resp.json())["data"]
+    return asyncio.run(fetch())
+
+def streamlit_metrics(path, monkeypatch) -> dict:
+    monkeypatch.setenv("SALES_DATA_PATH", str(path))
+    at = AppTest.from_file(str(ROOT / "src" / "dashboard_streamlit.py"), default_timeout=60).run()
+    at.sidebar.selectbox[0].select(YEAR)
+    at.sidebar.multiselect[0].set_value(REGIONS)
+    at.run()
+    assert not at.exception
+    return {m.label: m.value for m in at.metric}
+
+def test_same_kpis_from_cli_api_and_streamlit(sales_csv, policy, monkeypatch):
+    filters = {'Year': YEAR, 'Region': REGIONS}
+    expected = engine.get_engine(sales_csv).kpis(filters)
+    assert engine.get_engine(sales_csv).exact_counts(filters) == (policy > 0)
+
+    assert cli_kpis(sales_csv, monkeypatch) == expected
+    assert api_kpis(sales_csv) == expected
+    metrics = streamlit_metrics(sales_csv, monkeypatch)
+    assert metrics["Total Revenue"] == f"${expected['total_revenue']:,.0f}"
+    assert metrics["Total Orders"] == f"{expected['total_orders']}"
+    assert metrics["Unique Customers"] == f"{expected['unique_customers']}"
+    assert metrics["Top Product"] == expected['top_product']
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from generate_sample_data import write_dataset
+
+@pytest.mark.parametrize("rows, shards, workers", [(10, 3, 1), (1001, 4, 2), (7, 7, 1)])
+def test_order_ids_unique_across_uneven_shards(tmp_path, rows, shards, workers):
+    written = write_dataset(tmp_path / "out", rows, shards=shards, workers=workers, seed=1)
+    assert sum(n for _, n in written) == rows
+    orders = pd.concat([pd.read_csv(p, usecols=["OrderID"]) for p, _ in written])["OrderID"]
+    assert orders.is_unique
+    assert sorted(orders) == [f"O{100000 + i}" for i in range(rows)]
+
+def monthly_volume(written) -> pd.Series:
+    dates = pd.to_datetime(pd.concat([pd.read_csv(p, usecols=["Date"]) for p, _ in written])["Date"])
+    counts = dates.dt.to_period("M").value_counts().sort_index()
+    return counts / counts.mean()
+
+@pytest.mark.parametrize("layout", [{}, {"block_rows": 2000}, {"shards": 12}], ids=["one-block", "blocks", "shards"])
+def test_seasonality_spans_blocks_and_shards(tmp_path, layout):
+    written = write_dataset(tmp_path / "out", 24000, seed=2, start=pd.Timestamp("2023-01-01"), days=730,
+                            seasonality=0.8, **layout)
+    volume = monthly_volume(written)
+    assert len(volume) == 24
+    # a swing of +-80% keeps the quietest months well under half the volume of the busiest ones
+    assert volume.min() < 0.5 < 1.5 < volume.max()
+    # and it lines up with the same calendar months in both years
+    assert np.corrcoef(volume.iloc[:12], volume.iloc[12:])[0, 1] > 0.9
@@ -0,0 +1,107 @@
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import prepare_frame
+from conftest import ROOT
+from cube import CUBE_DIMENSIONS
+from incremental import IncrementalAggregates
+
+def cube_state(agg) -> pd.DataFrame:
+    dims = [c for c in CUBE_DIMENSIONS if c in agg.cube.columns]
+    cube = agg.cube.astype({'Year': 'int64', 'Rows': 'int64'})
+    return cube.sort_values(dims, ignore_index=True)[dims + ['Revenue', 'Quantity', 'Rows']]
+
+def sketch_state(agg) -> dict:
+    state = {}
+    for col, table in agg.sketches.items():
+        dims = [c for c in table.keys.columns if c != 'Year']
+        keys = table.keys[dims].itertuples(index=False, name=None)
+        state[col] = {key: regs.tobytes() for key, regs in zip(keys, table.registers)}
+    return state
+
+def assert_same_state(agg, expected):
+    pd.testing.assert_frame_equal(cube_state(agg), cube_state(expected), check_dtype=False, check_categorical=False)
+    assert sketch_state(agg) == sketch_state(expected)
+    assert agg.rows == expected.rows
+
+@pytest.fixture
+def full(sales_raw):
+    return IncrementalAggregates.from_frame(prepare_frame(sales_raw.copy()))
+
+@pytest.mark.parametrize("shuffle", [False, True], ids=["in-order", "late-rows"])
+def test_batches_match_full_rebuild(sales_raw, full, shuffle):
+    raw = sales_raw.sample(frac=1, random_state=3) if shuffle else sales_raw
+    agg = IncrementalAggregates()
+    for part in np.array_split(np.arange(len(raw)), 7):
+        agg.append(raw.iloc[part])
+    assert agg.batches == 7
+    assert_same_state(agg, full)
+    assert agg.kpis() == pytest.approx(full.kpis())
+
+def test_append_onto_full_build(sales_raw, full):
+    agg = IncrementalAggregates.from_frame(prepare_frame(sales_raw.iloc[:2000].copy()))
+    agg.append(sales_raw.iloc[2000:])
+    assert_same_state(agg, full)
+
+def test_save_load_round_trip(sales_raw, full, tmp_path):
+    agg = IncrementalAggregates()
+    agg.append(sales_raw.iloc[:1500])
+    agg.save(tmp_path / "state" / "agg.pkl")
+    loaded = IncrementalAggregates.load(tmp_path / "state" / "agg.pkl")
+    assert_same_state(loaded, agg)
+    assert loaded.batches == agg.batches
+    # the loaded state keeps accepting batches
+    loaded.append(sales_raw.iloc[1500:])
+    assert_same_state(loaded, full)
+
+def test_empty_batches_leave_state_unchanged(sales_raw, full):
+    agg = IncrementalAggregates.from_frame(prepare_frame(sales_raw.copy()))
+    assert agg.append(sales_raw.iloc[:0]).empty
+    bad_dates = sales_raw.iloc[:10].assign(Date="not-a-date")
+    assert agg.append(bad_dates).empty
+    assert agg.batches == 1
+    assert_same_state(agg, full)
+
+def test_empty_first_batch():
+    agg = IncrementalAggregates()
+    agg.append(pd.DataFrame(columns=["OrderID", "Date", "Product", "Region", "Revenue"]))
+    assert agg.rows == 0 and agg.cube.empty and agg.sketches == {}
+
+def test_unseen_month(sales_raw, full):
+    agg = IncrementalAggregates.from_frame(prepare_frame(sales_raw.copy()))
+    batch = sales_raw.dropna(subset=['Revenue']).iloc[:40].assign(Date="2031-06-15")
+    batch['OrderID'] = [f"N{i}" for i in range(len(batch))]
+    agg.append(batch)
+    cells = agg.cells({'Year': 2031})
+    assert set(cells['Month']) == {pd.Timestamp("2031-06-01")}
+    kp = agg.kpis({'Year': 2031})
+    assert kp['total_revenue'] == pytest.approx(batch['Revenue'].sum())
+    assert kp['total_orders'] == pytest.approx(len(batch), abs=1)
+    # earlier months are untouched
+    before = full.kpis({'Year': 2024})
+    assert agg.kpis({'Year': 2024}) == pytest.approx(before)
+
+def test_kpis_with_uncovered_filter(sales_raw, full):
+    product = sales_raw['Product'].mode()[0]
+    kp = full.kpis({'Year': 2024, 'Product': product})
+    assert kp['total_orders'] is None and kp['avg_order_value'] is None and kp['unique_customers'] is None
+    expected = prepare_frame(sales_raw.copy()).query("Year == 2024 and Product == @product")['Revenue'].sum()
+    assert kp['total_revenue'] == pytest.approx(expected)
+    assert kp['top_product'] == product
+    assert full.summary({'Product': product})['kpis']['total_orders'] is None
+
+def test_cli_appends_batches_to_state_file(sales_raw, full, tmp_path):
+    first, second = tmp_path / "a.csv", tmp_path / "b.csv"
+    sales_raw.iloc[:1000].to_csv(first, index=False)
+    sales_raw.iloc[1000:].to_csv(second, index=False)
+    state = tmp_path / "agg.pkl"
+    proc = subprocess.run([sys.executable, str(ROOT / "src" / "incremental.py"), str(state), str(first), str(second)],
+                          capture_output=True, text=True, cwd=tmp_path)
+    assert proc.returncode == 0, proc.stderr
+    lines = proc.stdout.strip().splitlines()
+    assert len(lines) == 2 and lines[1].startswith(f"{second}: {full.rows:,} rows in 2 batches")
+    assert_same_state(IncrementalAggregates.load(state), full)
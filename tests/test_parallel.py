@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+import analytics
+import parallel
+from engine import Engine
+
+@pytest.fixture
+def df(sales_csv):
+    return Engine(sales_csv, use_cache=False).df
+
+@pytest.mark.parametrize("min_rows", [10**9, 0], ids=["below-threshold", "workers"])
+def test_groupby_sums_match_pandas(df, monkeypatch, min_rows):
+    monkeypatch.setattr(parallel, "PARALLEL_MIN_ROWS", min_rows)
+    got = parallel.groupby_sums(df, ['Region', 'Product'], ('Revenue', 'Quantity'), workers=2)
+    expected = df.groupby(['Region', 'Product'], observed=True)[['Revenue', 'Quantity']].sum()
+    np.testing.assert_allclose(got[['Revenue', 'Quantity']].to_numpy(), expected.to_numpy())
+    assert list(got.index) == list(expected.index)
+    assert analytics.kpis(df, workers=2) == pytest.approx(analytics.kpis(df))
+    parallel.shutdown()
+
+def test_small_inputs_stay_in_process(df):
+    assert len(df) < parallel.PARALLEL_MIN_ROWS
+    parallel.groupby_sums(df, 'Region', workers=4)
+    assert parallel._POOLS == {}
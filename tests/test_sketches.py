@@ -0,0 +1,46 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import prepare_frame
+from sketches import SketchTable
+
+def registers_by_cell(table) -> dict:
+    dims = [c for c in table.keys.columns if c != 'Year']
+    keys = (tuple(None if pd.isna(v) else v for v in key) for key in table.keys[dims].itertuples(index=False, name=None))
+    return {key: regs.tobytes() for key, regs in zip(keys, table.registers)}
+
+@pytest.fixture
+def prepared(sales_raw):
+    return prepare_frame(sales_raw.copy())
+
+def test_merge_in_place_matches_build(prepared):
+    table = SketchTable.build(prepared.iloc[:2500], 'OrderID')
+    for part in np.array_split(np.arange(2500, len(prepared)), 5):
+        assert table.merge(SketchTable.build(prepared.iloc[part], 'OrderID')) is table
+    assert registers_by_cell(table) == registers_by_cell(SketchTable.build(prepared, 'OrderID'))
+
+def test_merge_of_known_cells_does_not_reallocate(prepared):
+    table = SketchTable.build(prepared, 'CustomerID')
+    registers, cells = table._registers, len(table.keys)
+    table.merge(SketchTable.build(prepared.iloc[:50], 'CustomerID'))
+    assert table._registers is registers and len(table.keys) == cells
+
+def test_pickle_drops_spare_rows(prepared):
+    table = SketchTable.build(prepared.iloc[:100], 'OrderID').merge(SketchTable.build(prepared.iloc[100:], 'OrderID'))
+    restored = pickle.loads(pickle.dumps(table))
+    assert len(restored._registers) == len(restored.keys)
+    assert registers_by_cell(restored) == registers_by_cell(table)
+    assert restored.count({'Year': 2024}) == table.count({'Year': 2024})
+
+def test_missing_labels_merge_into_one_cell(prepared):
+    rows = prepared.iloc[:20].assign(Region=np.nan)
+    table = SketchTable.build(rows.iloc[:10], 'OrderID').merge(SketchTable.build(rows.iloc[10:], 'OrderID'))
+    assert len(table.keys) == len(SketchTable.build(rows, 'OrderID').keys)
+    assert registers_by_cell(table) == registers_by_cell(SketchTable.build(rows, 'OrderID'))
+
+def test_precision_mismatch(prepared):
+    with pytest.raises(ValueError):
+        SketchTable.build(prepared, 'OrderID', precision=10).merge(SketchTable.build(prepared, 'OrderID'))